@@ -0,0 +1,124 @@
+import math
+import numpy as np
+from graphs import csrGraph
+from convergence import rankResult
+
+class HITS:
+	"""Hub and Authority scores of pages visualized as a graph.
+
+	Contains function to calculate hub and authority score of pages using
+	Kleinberg's HITS Algorithm. A good hub links to many good authorities
+	and a good authority is linked by many good hubs.
+
+	...
+
+	Parameters
+	----------
+	edges : collections.defaltdict(list) or graphs.csrGraph
+		Adjacency list containing information of connections in web-graph.
+		Edge weights are used as link strengths if a weighted csrGraph is
+		given.
+
+	epsilon : float
+		A small value and total error in scores should be less than epsilon.
+
+	max_iterations : int
+		Maximum number of times to apply power iteration.
+
+	node_num : int
+		Number of nodes in the web-graph
+
+	norm : {'l1', 'linf', 'topk'}, optional
+		How the error between two iterations is measured (for hub and
+		authority scores separately); 'topk' stops once the order of the
+		top `top_k` nodes is stable.
+		Default value : 'l1'
+
+	top_k : int, optional
+		Number of nodes compared by the 'topk' norm.
+		Default value : 10
+
+
+	order : {'edges', 'epsilon', 'max_iterations', 'node_num', 'norm',
+			'top_k'}
+		Parameters follows precisely the above order.
+		Only `norm` and `top_k` are optional.
+
+
+	Attributes
+	----------
+	results : list of convergence.rankResult
+		Convergence report of every call to `hits()`, in order. Its
+		`rank_vector` has the hub and authority scores as columns.
+
+
+	Methods
+	-------
+	hits()
+		Calculate hub and authority score of all nodes in the web-graph.
+
+	"""
+
+	def __init__(self, edges, epsilon, max_iterations, node_num, norm='l1',
+		top_k=10):
+		self.edges = edges
+		self.epsilon = epsilon
+		self.node_num = node_num
+		self.MAX_ITERATIONS = max_iterations
+		self.norm = norm
+		self.top_k = top_k
+		self.results = []
+
+
+	def hits(self):
+		"""Hub and authority score of all nodes in the web-graph.
+
+		Authority of a page is gathered from the hubs linking to it and hub
+		score of a page is gathered from the authorities it links to. Both
+		are normalized to sum up to 1.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		hub_vector : numpy.ndarray [1-dimensional, dtype=float]
+			Contains hub score of each node in the web-graph.
+
+		authority_vector : numpy.ndarray [1-dimensional, dtype=float]
+			Contains authority score of each node in the web-graph.
+
+		"""
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		adjacency_matrix = graph.get_adjacencyMatrix()
+		reverse_adjacency_matrix = adjacency_matrix.transpose()
+		result = rankResult('HITS', self.epsilon, self.MAX_ITERATIONS,
+			self.norm, self.top_k)
+
+		hub_vector = np.full(self.node_num, 1 / self.node_num)
+		authority_vector = np.full(self.node_num, 1 / self.node_num)
+
+		iterations = 0
+		diff = math.inf
+
+		while(iterations < self.MAX_ITERATIONS and diff > self.epsilon):
+			new_authority_vector = reverse_adjacency_matrix @ hub_vector
+			new_authority_vector /= max(new_authority_vector.sum(),
+				np.finfo('float').tiny)
+			new_hub_vector = adjacency_matrix @ new_authority_vector
+			new_hub_vector /= max(new_hub_vector.sum(), np.finfo('float').tiny)
+
+			diff = result.update(np.column_stack((new_hub_vector,
+				new_authority_vector)), np.column_stack((hub_vector,
+				authority_vector)))
+			hub_vector = new_hub_vector
+			authority_vector = new_authority_vector
+			iterations += 1
+			print("HITS iteration: " + str(iterations))
+
+		self.results.append(result.finish(graph.to_original(np.column_stack((
+			hub_vector, authority_vector))), iterations))
+		return (result.rank_vector[:, 0], result.rank_vector[:, 1])
@@ -1,6 +1,7 @@
 import math
 import numpy as np
-from graphs import plotGraph
+from convergence import rankResult
+from graphs import plotGraph, csrGraph
 
 class PageRank:
 	"""PageRank of pages visualized as a graph.
@@ -15,10 +16,13 @@ class PageRank:
 	Parameters
 	----------
 	beta : float
-		Probability with which teleports will occur.
+		Probability with which a random surfer follows a link (damping
+		factor, e.g. 0.85). Teleports occur with probability 1 - beta.
 	
-	edges : collections.defaltdict(list)
+	edges : collections.defaltdict(list) or graphs.csrGraph
 		Adjacency list containing information of connections in web-graph.
+		Rank is split among children in proportion to edge weights if
+		a weighted csrGraph is given.
 	
 	epsilon : float
 		A small value and total error in ranks should be less than epsilon.
@@ -29,34 +33,75 @@ class PageRank:
 	node_num : int
 		Number of nodes in the web-graph
 
+	checkpoint : checkpoint.rankCheckpoint, optional
+		Periodically saves the state of power iteration and resumes from
+		it if asked to.
+		Default value : None
+
+	plot : bool or string, optional
+		Plot the web-graph after every iteration. If a directory is given,
+		frames are saved there as images instead of being shown.
+		Default value : True
+
+	norm : {'l1', 'linf', 'topk'}, optional
+		How the error between two iterations is measured; 'topk' stops
+		once the order of the top `top_k` nodes is stable.
+		Default value : 'l1'
+
+	top_k : int, optional
+		Number of nodes compared by the 'topk' norm.
+		Default value : 10
+
 	
-	order : {'beta', 'edges', 'epsilon', 'max_iterations', 'node_num'}
+	order : {'beta', 'edges', 'epsilon', 'max_iterations', 'node_num',
+			'checkpoint', 'plot', 'norm', 'top_k'}
 		Parameters follows precisely the above order.
-		None of the parameter is optional.
+		Only `checkpoint`, `plot`, `norm` and `top_k` are optional.
+
+
+	Attributes
+	----------
+	results : list of convergence.rankResult
+		Convergence report of every call to `pageRank()`, in order.
 
 	
 	Methods
 	-------
-	pageRank()
+	pageRank(initial_rank_vector=None)
 		Calculate PageRank of all nodes in the web-graph.
 
 	"""
 	
-	def __init__(self, beta, edges, epsilon, max_iterations, node_num):
+	def __init__(self, beta, edges, epsilon, max_iterations, node_num,
+		checkpoint=None, plot=True, norm='l1', top_k=10):
 		self.beta = beta
 		self.edges = edges
 		self.epsilon = epsilon
 		self.node_num = node_num
 		self.MAX_ITERATIONS = max_iterations
+		self.checkpoint = checkpoint
+		self.plot = plot
+		self.norm = norm
+		self.top_k = top_k
+		self.results = []
 
 
-	def pageRank(self):
+	def pageRank(self, initial_rank_vector=None):
 		"""PageRank of all nodes in the web-graph.
 
+		A random surfer follows a link with probability `beta`. Rank which
+		is not passed along a link (teleports and rank leaking through
+		dead-ends) is spread equally over all nodes. Convergence details
+		are appended to `results`.
+
 	
 		Parameters
 		----------
-		None
+		initial_rank_vector : numpy.ndarray [1-dimensional, dtype=float],
+			optional
+			Rank vector to start from, e.g. PageRank for a nearby `beta`.
+			A resumed checkpoint takes precedence.
+			Default value : None (rank is distributed equally)
 
 		
 		Returns
@@ -65,31 +110,64 @@ class PageRank:
 			Contains PageRank of each node in the web-graph.
 
 		"""
-		final_rank_vector = np.zeros(self.node_num)
-		initial_rank_vector = np.fromiter(
-			[1 / self.node_num for _ in range(self.node_num)], dtype='float')
-		
 		iterations = 0
 		diff = math.inf
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		transition_matrix = graph.get_transitionMatrix()
+
+		final_rank_vector = np.zeros(self.node_num)
+		if initial_rank_vector is None:
+			initial_rank_vector = np.full(self.node_num, 1 / self.node_num)
+		elif graph.permutation is not None:
+			initial_rank_vector = np.asarray(initial_rank_vector)[
+				graph.permutation]
+		result = rankResult('PageRank', self.epsilon, self.MAX_ITERATIONS,
+			self.norm, self.top_k)
+
+		if self.checkpoint is not None:
+			key = self.checkpoint.get_key('PageRank', self.beta, 
+				self.node_num, self.checkpoint.get_graphKey(graph), self.norm)
+			state = self.checkpoint.load('PageRank', key, self.node_num)
+			if state is not None:
+				iterations, diff, initial_rank_vector, _ = state
+				final_rank_vector = initial_rank_vector
+				result.residual = diff
+				if self.norm == 'topk':
+					# topk compares with the ranking of the last iteration
+					result.previous_topK = result.get_topK(
+						initial_rank_vector.reshape(-1, 1))
 		
-		pg = plotGraph(self.edges, interval=3000)
+		pg = plotGraph(self.edges, interval=3000, output_dir=self.plot if 
+			isinstance(self.plot, str) else None, name='PageRank')
 
 		while(iterations < self.MAX_ITERATIONS and diff > self.epsilon):
-			new_rank_vector = np.zeros(self.node_num)
-			for parent in self.edges:
-				for child in self.edges[parent]:
-					new_rank_vector[child] += (initial_rank_vector[parent] /
-					len(self.edges[parent]))
-
-			leaked_rank = (1-sum(new_rank_vector))/self.node_num
-			final_rank_vector = new_rank_vector + leaked_rank
-			diff = sum(abs(final_rank_vector - initial_rank_vector))
+			new_rank_vector = self.beta * (transition_matrix @
+				initial_rank_vector)
+
+			leaked_mass = self.beta - new_rank_vector.sum()
+			final_rank_vector = new_rank_vector + (1 - self.beta + leaked_mass
+				) / self.node_num
+			diff = result.update(final_rank_vector, initial_rank_vector,
+				leaked_mass)
 			initial_rank_vector = final_rank_vector
 			iterations += 1
 			print("PageRank iteration: " + str(iterations))
+
+			if (self.checkpoint is not None and 
+				self.checkpoint.is_due(iterations)):
+				self.checkpoint.save('PageRank', key, iterations, diff,
+					final_rank_vector)
 			
-			pg.plot(9, final_rank_vector)
+			if self.plot:
+				pg.plot(min(9, self.node_num), final_rank_vector)
 			# print(final_rank_vector)
 			# print('\n')
 
-		return final_rank_vector
\ No newline at end of file
+		if self.checkpoint is not None:
+			self.checkpoint.save('PageRank', key, iterations, diff,
+				final_rank_vector, finished=True)
+			self.checkpoint.wait()
+
+		self.results.append(result.finish(graph.to_original(
+			final_rank_vector), iterations))
+		return result.rank_vector
\ No newline at end of file
@@ -1,9 +1,30 @@
 import math
 import heapq
 import numpy as np
+from graphs import csrGraph
+from shared import sharedGraph
+from convergence import rankResult
+from concurrent.futures import ProcessPoolExecutor
 from scipy.sparse import csr_matrix as SparseMatrix
 
 
+def _solve_topic(task):
+	"""Solves one topic in a worker process attached to the shared graph."""
+	handle, parameters, topic_number, topic = task
+	shared = sharedGraph.attach(handle)
+	try:
+		(beta, epsilon, max_iterations, checkpoint, norm, top_k) = parameters
+		tsr = TopicSpecificRank(beta, shared.get_graph(), epsilon,
+			max_iterations, handle['node_num'], None, checkpoint, norm, top_k)
+		shared.get_array('topic_ranks')[:, topic_number] = (
+			tsr.list_get_topicSpecificRank(topic, topic_number))
+		result = tsr.results[-1]
+		result.rank_vector = None
+		return result
+	finally:
+		shared.release()
+
+
 class TopicSpecificRank:
 	"""Similar to PageRank but the teleport set is a subset(related topics)
 	of all nodes.
@@ -14,10 +35,13 @@ class TopicSpecificRank:
 	----------
 	
 	beta : float
-		Probability with which teleports will occur
+		Probability with which a random surfer follows a link (damping
+		factor, e.g. 0.85). Teleports occur with probability 1 - beta
 	
-	edges : collections.defaltdict(list)
+	edges : collections.defaltdict(list) or graphs.csrGraph
 		Adjacency list containing information connections in web-graph
+		Rank is split among children in proportion to edge weights if
+		a weighted csrGraph is given
 	
 	epsilon : float
 		A small value and total error in ranks should be less than epsilon
@@ -31,11 +55,31 @@ class TopicSpecificRank:
 	PageRank_vector : numpy.ndarray  [1-dimensional, dtype=float]
 		Contains PageRank of each node in the web-graph
 
+	checkpoint : checkpoint.rankCheckpoint, optional
+		Periodically saves the state of power iteration of each topic and
+		resumes from it if asked to. Finished topics are not solved again.
+		Default value : None
+
+	norm : {'l1', 'linf', 'topk'}, optional
+		How the error between two iterations is measured; 'topk' stops
+		once the order of the top `top_k` nodes is stable.
+		Default value : 'l1'
+
+	top_k : int, optional
+		Number of nodes compared by the 'topk' norm.
+		Default value : 10
+
 	
 	order : {'beta', 'edges', 'epsilon', 'max_iterations', 'node_num', 
-	'PageRank_vector'}
+	'PageRank_vector', 'checkpoint', 'norm', 'top_k'}
 		Parameters follows precisely the above order.
-		None of the parameter is optional.
+		Only `checkpoint`, `norm` and `top_k` are optional.
+
+
+	Attributes
+	----------
+	results : list of convergence.rankResult
+		Convergence report of every solved topic, in order.
 
 	
 	Methods
@@ -53,21 +97,29 @@ class TopicSpecificRank:
 		Applies power iteration on Google Matrix and Initial Rank Matrix 
 		to get TopicSpecificRank Matrix.
 
-	list_get_topicSpecificRank()
+	list_get_topicSpecificRank(teleport_set, topic_number=0,
+		initial_rank_vector=None)
 		Alternative method for power iteration which used much less RAM.
 
-	topicSpecificRank()
+	parallel_list_get_topicSpecificRank(lol_of_topic_pages, processes)
+		Solves topics in parallel processes sharing one copy of the graph.
+
+	topicSpecificRank(processes=1)
 		Utility function which call other functions and returns rank vector.
 
 	"""
 	def __init__(self, beta, edges, epsilon, max_iterations, node_num,
-		PageRank_vector):
+		PageRank_vector, checkpoint=None, norm='l1', top_k=10):
 		self.beta = beta
 		self.edges = edges
 		self.epsilon = epsilon
 		self.node_num = node_num
 		self.PageRank_vector = PageRank_vector
 		self.MAX_ITERATIONS = max_iterations
+		self.checkpoint = checkpoint
+		self.norm = norm
+		self.top_k = top_k
+		self.results = []
 
 
 	def get_similarTopicPages(self):
@@ -135,6 +187,8 @@ class TopicSpecificRank:
 			Proportion of rank depends on degree of node and leaked rank.
 		"""
 		related_set_size = len(related_pages)
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		related_pages = graph.from_original(related_pages)
 
 		teleport_matrix_row = []
 		teleport_matrix_col = []
@@ -151,20 +205,8 @@ class TopicSpecificRank:
 			teleport_matrix_row, teleport_matrix_col)), shape = (self.node_num,
 				self.node_num))
 
-		connection_matrix_row = []
-		connection_matrix_col = []
-		connection_matrix_data = []
-
-		for parent_node in range(self.node_num):
-			for child_node in self.edges[parent_node]:
-				connection_matrix_col.append(parent_node)
-				connection_matrix_row.append(child_node)
-				connection_matrix_data.append(
-					self.beta / (len(self.edges[parent_node])))
-		
-		connection_matrix = SparseMatrix((connection_matrix_data, (
-			connection_matrix_row, connection_matrix_col)), shape = (self.
-			node_num, self.node_num))
+		connection_matrix = SparseMatrix(self.beta * 
+			graph.get_transitionMatrix())
 
 		google_matrix = connection_matrix + teleport_matrix
 		return google_matrix	
@@ -209,32 +251,44 @@ class TopicSpecificRank:
 		iterations = 0
 		diff = math.inf
 		teleport_set_size = len(teleport_set)
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		teleport_set = graph.from_original(teleport_set)
+		result = rankResult('TopicSpecificRank', self.epsilon,
+			self.MAX_ITERATIONS, self.norm, self.top_k)
 		final_rank_vector = SparseMatrix(np.zeros(self.node_num).transpose())
 
+		teleport_vector = np.zeros(self.node_num)
+		teleport_vector[teleport_set] = 1 / teleport_set_size
+		teleport_vector = SparseMatrix(teleport_vector).transpose()
+
 		while(iterations < self.MAX_ITERATIONS and diff > self.epsilon):
-			new_rank_vector = google_matrix * initial_rank_vector
+			new_rank_vector = google_matrix @ initial_rank_vector
 
-			leaked_rank = (1-SparseMatrix.sum(new_rank_vector))/
-				teleport_set_size
-			leaked_rank_vector = SparseMatrix(np.array([leaked_rank if node in
-				teleport_set else 0 for node in range(self.node_num)])).
-				transpose()
-			
-			final_rank_vector = new_rank_vector + leaked_rank_vector
-			diff = SparseMatrix.sum(
-				abs(final_rank_vector - initial_rank_vector))
+			leaked_mass = 1 - new_rank_vector.sum()
+			final_rank_vector = new_rank_vector + leaked_mass * teleport_vector
+			diff = result.update(final_rank_vector.toarray().ravel(),
+				initial_rank_vector.toarray().ravel(), leaked_mass)
 			
 			initial_rank_vector = final_rank_vector
 			iterations += 1
 			print("At iteration: " + str(iterations))
 
+		if graph.permutation is not None:
+			final_rank_vector = final_rank_vector[graph.from_original(
+				range(self.node_num))]
+		self.results.append(result.finish(final_rank_vector, iterations))
 		return final_rank_vector
 
 
-	def list_get_topicSpecificRank(self, teleport_set):
+	def list_get_topicSpecificRank(self, teleport_set, topic_number=0,
+		initial_rank_vector=None):
 		"""Calculates TopicSpecificRank of each node taking some related
 		pages as `teleport_set`. Related Pages belong to same topic.
 
+		Rank is passed along links with probability `beta`; the rest
+		(teleports and rank leaking through dead-ends) goes back to
+		`teleport_set`, like in the Google Matrix.
+
 
 		Parameters
 		----------
@@ -243,6 +297,16 @@ class TopicSpecificRank:
 			teleport to.
 			In TopicSpecificRank this set corresponds to pages of same topic.
 
+		topic_number : int, optional
+			Identifies the topic in checkpoints.
+			Default value : 0
+
+		initial_rank_vector : numpy.ndarray [1-dimensional, dtype=float],
+			optional
+			Rank vector to start from, e.g. the rank of the same topic for
+			a nearby `beta`. A resumed checkpoint takes precedence.
+			Default value : None (rank is distributed over `teleport_set`)
+
 		
 		Returns
 		-------
@@ -254,39 +318,118 @@ class TopicSpecificRank:
 		iterations = 0
 		teleport_set_size = len(teleport_set)
 
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		transition_matrix = graph.get_transitionMatrix()
+		teleport_set = graph.from_original(teleport_set)
+		result = rankResult('TopicSpecificRank-' + str(topic_number),
+			self.epsilon, self.MAX_ITERATIONS, self.norm, self.top_k)
+
+		teleport_vector = np.zeros(self.node_num)
+		teleport_vector[teleport_set] = 1 / teleport_set_size
 		final_rank_vector = np.zeros(self.node_num)
-		initial_rank_vector = np.fromiter(
-			[1/teleport_set_size if node in teleport_set else 0 for node in
-				range(self.node_num)], dtype='float')
+		if initial_rank_vector is None:
+			initial_rank_vector = teleport_vector
+		elif graph.permutation is not None:
+			initial_rank_vector = np.asarray(initial_rank_vector)[
+				graph.permutation]
+
+		if self.checkpoint is not None:
+			name = 'TopicSpecificRank-' + str(topic_number)
+			key = self.checkpoint.get_key(name, self.beta, self.node_num,
+				self.checkpoint.get_graphKey(graph), sorted(teleport_set),
+				self.norm)
+			state = self.checkpoint.load(name, key, self.node_num)
+			if state is not None:
+				iterations, diff, initial_rank_vector, _ = state
+				final_rank_vector = initial_rank_vector
+				result.residual = diff
+				if self.norm == 'topk':
+					# topk compares with the ranking of the last iteration
+					result.previous_topK = result.get_topK(
+						initial_rank_vector.reshape(-1, 1))
 		
 		while(iterations < self.MAX_ITERATIONS and diff > self.epsilon):
-			new_rank_vector = np.zeros(self.node_num)
-			for parent in self.edges:
-				for child in self.edges[parent]:
-					new_rank_vector[child] += initial_rank_vector[parent] /
-						len(self.edges[parent])
-
-			leaked_rank = (1 - sum(new_rank_vector)) / teleport_set_size
-			leaked_rank_vector = np.array([leaked_rank if node in teleport_set 
-				else 0 for node in range(self.node_num)])
-			
-			final_rank_vector = new_rank_vector + leaked_rank_vector
-			diff = sum(abs(final_rank_vector - initial_rank_vector))
+			new_rank_vector = self.beta * (transition_matrix @
+				initial_rank_vector)
+
+			leaked_mass = self.beta - new_rank_vector.sum()
+			final_rank_vector = new_rank_vector + (1 - self.beta + leaked_mass
+				) * teleport_vector
+			diff = result.update(final_rank_vector, initial_rank_vector,
+				leaked_mass)
 			initial_rank_vector = final_rank_vector
 			
 			iterations += 1
 			print("At iteration: " + str(iterations))
 
-		return final_rank_vector
+			if (self.checkpoint is not None and 
+				self.checkpoint.is_due(iterations)):
+				self.checkpoint.save(name, key, iterations, diff,
+					final_rank_vector)
 
+		if self.checkpoint is not None:
+			self.checkpoint.save(name, key, iterations, diff,
+				final_rank_vector, finished=True)
+			self.checkpoint.wait()
 
-	def topicSpecificRank(self):
+		self.results.append(result.finish(graph.to_original(
+			final_rank_vector), iterations))
+		return result.rank_vector
+
+
+	def parallel_list_get_topicSpecificRank(self, lol_of_topic_pages,
+		processes):
+		"""Solves topics in parallel processes sharing one copy of the graph.
+
+		The web-graph and the result matrix are put in shared memory once;
+		every worker attaches to them by name instead of receiving a pickled
+		copy of the graph.
+
+
+		Parameters
+		----------
+		lol_of_topic_pages : list of list of int
+			Each inner list contains the pages of one topic.
+
+		processes : int
+			Number of worker processes.
+
+
+		Returns
+		-------
+		dict_of_rank_vectors : dict of int and numpy.ndarray 
+			[1-dimensional, dtype=float]
+			Rank of pages in the web-graph wrt each topic number.
+
+		"""
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		parameters = (self.beta, self.epsilon, self.MAX_ITERATIONS,
+			self.checkpoint, self.norm, self.top_k)
+
+		with sharedGraph.create(graph, topic_ranks=np.zeros((self.node_num,
+			len(lol_of_topic_pages)))) as shared:
+			tasks = [(shared.handle, parameters, topic_number, topic) for
+				(topic_number, topic) in enumerate(lol_of_topic_pages)]
+			with ProcessPoolExecutor(processes) as executor:
+				results = list(executor.map(_solve_topic, tasks))
+			topic_ranks = shared.get_array('topic_ranks').copy()
+
+		for (topic_number, result) in enumerate(results):
+			result.rank_vector = topic_ranks[:, topic_number]
+		self.results.extend(results)
+		return {topic_number: topic_ranks[:, topic_number] for topic_number
+			in range(len(lol_of_topic_pages))}
+
+
+	def topicSpecificRank(self, processes=1):
 		"""Utility function which calls other functions in a specific order.
 
 		
 		Parameters
 		----------
-		None
+		processes : int, optional
+			Number of topics solved in parallel.
+			Default value : 1
 
 		
 		Returns
@@ -306,12 +449,16 @@ class TopicSpecificRank:
 			int is the topic number
 			ndarray has rank of pages in the web-graph wrt that topic.  
 		"""
-		lol_of_topic_pages = self.matrix_get_similarTopicPages()
+		lol_of_topic_pages = self.get_similarTopicPages()
+		if processes > 1:
+			return self.parallel_list_get_topicSpecificRank(
+				lol_of_topic_pages, processes)
 		list_of_rank_vectors = {}
 		
-		for topic in lol_of_topic_pages:
+		for (topic_number, topic) in enumerate(lol_of_topic_pages):
 			## approach 1 :: uses adjacency list to calc. rank
-			topicSpecificRank_vector = list_get_topicSpecificRank(topic)
+			topicSpecificRank_vector = self.list_get_topicSpecificRank(topic,
+				topic_number)
 			
 			## approach 2: RAM eater :: uses SparseMatrices to calc. rank
 			# initialRank_vector = self.matrix_get_initailRankMatrix()
@@ -320,7 +467,5 @@ class TopicSpecificRank:
 			# topicSpecificRank_vector = self.matrix_get_topicSpecificRank(
 			# topic, initialRank_vector, google_matrix)
 		
-			list_of_rank_vectors[topic] = topicSpecificRank_vector
-			# can append topic number instead of topic(list)^^
-			# create a function to map topic with topic_number
+			list_of_rank_vectors[topic_number] = topicSpecificRank_vector
 		return list_of_rank_vectors
\ No newline at end of file
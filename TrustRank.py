@@ -1,7 +1,8 @@
 import math
-import heapq
 import numpy as np
-from graphs import plotGraph
+from topk import streamingTopK
+from convergence import rankResult
+from graphs import plotGraph, csrGraph, readPages
 from scipy.sparse import csr_matrix as SparseMatrix
 
 
@@ -17,10 +18,13 @@ class TrustRank:
 	Parameters
 	----------
 	beta : float
-		Probability with which teleports will occur.
+		Probability with which a random surfer follows a link (damping
+		factor, e.g. 0.85). Teleports occur with probability 1 - beta.
 	
-	edges : collections.defaltdict(list)
+	edges : collections.defaltdict(list) or graphs.csrGraph
 		Adjacency list containing information connections in web-graph.
+		Trust is split among children in proportion to edge weights if
+		a weighted csrGraph is given.
 	
 	epsilon : float
 		A small value and total error in ranks should be less than epsilon.
@@ -34,11 +38,31 @@ class TrustRank:
 	PageRank_vector : numpy.ndarray  [1-dimensional, dtype=float]
 		Contains PageRank of each node in the web-graph.
 
+	plot : bool or string, optional
+		Plot the web-graph after every iteration. If a directory is given,
+		frames are saved there as images instead of being shown.
+		Default value : True
+
+	norm : {'l1', 'linf', 'topk'}, optional
+		How the error between two iterations is measured; 'topk' stops
+		once the order of the top `top_k` nodes is stable.
+		Default value : 'l1'
+
+	top_k : int, optional
+		Number of nodes compared by the 'topk' norm.
+		Default value : 10
+
 	
 	order : {'beta', 'edges', 'epsilon', 'max_iterations', 'node_num',
-			'PageRank_vector'}
+			'PageRank_vector', 'plot', 'norm', 'top_k'}
 		Parameters follows precisely the above order.
-		None of the parameter is optional.
+		Only `plot`, `norm` and `top_k` are optional.
+
+
+	Attributes
+	----------
+	results : list of convergence.rankResult
+		Convergence report of every power iteration, in order.
 
 	
 	Methods
@@ -52,15 +76,31 @@ class TrustRank:
 	trustRank()
 		Utility function which call other functions and returns rank vector.
 
+	get_seedPages(seed_file)
+		Reads a set of seed pages from a file.
+
+	batch_topicSpecificRank(seed_sets, reverse=False)
+		Calculates TrustRank for many seed sets in one batched propagation.
+
+	batch_trustRank(good_seed_files, spam_seed_files=())
+		Calculates trust and anti-trust of each node for many seed files.
+
+	get_spamMass(trust_vectors, seed_set_sizes)
+		Calculates relative spam mass of each node.
+
 	"""
 	def __init__(self, beta, edges, epsilon, max_iterations, node_num,
-		PageRank_vector):
+		PageRank_vector, plot=True, norm='l1', top_k=10):
 		self.beta = beta
 		self.edges = edges
 		self.epsilon = epsilon
 		self.node_num = node_num
 		self.PageRank_vector = PageRank_vector
 		self.MAX_ITERATIONS = max_iterations
+		self.plot = plot
+		self.norm = norm
+		self.top_k = top_k
+		self.results = []
 
 		
 	def get_trustedPages(self, node_number_threshold=100):
@@ -89,11 +129,8 @@ class TrustRank:
 		trusted_set_size = int(math.ceil(self.node_num * ratio))
 		
 		# set and return trusted pages
-		heaped_ranks = [(rank, node) for (node, rank) in 
-			enumerate(self.PageRank_vector)]
-		heapq._heapify_max(heaped_ranks)
-		trusted_pages = [heapq._heappop_max(heaped_ranks)[1] 
-			for _ in range(trusted_set_size)]
+		topK = streamingTopK(trusted_set_size).feed(self.PageRank_vector)
+		trusted_pages = [node for (_, node) in topK.get_topK()]
 		
 		return trusted_pages
 
@@ -101,6 +138,10 @@ class TrustRank:
 		"""Calculates TrustRank of each node taking trusted set as 
 		`teleport_set`.
 
+		Trust is passed along links with probability `beta`; the rest
+		(teleports and trust leaking through dead-ends) goes back to
+		`teleport_set`.
+
 		
 		Parameters
 		----------
@@ -120,34 +161,38 @@ class TrustRank:
 		iterations = 0
 		teleport_set_size = len(teleport_set)
 
-		pg = plotGraph(self.edges, interval=3000)
+		pg = plotGraph(self.edges, interval=3000, output_dir=self.plot if 
+			isinstance(self.plot, str) else None, name='TrustRank')
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		transition_matrix = graph.get_transitionMatrix()
+		teleport_set = graph.from_original(teleport_set)
+		result = rankResult('TrustRank', self.epsilon, self.MAX_ITERATIONS,
+			self.norm, self.top_k)
 
+		teleport_vector = np.zeros(self.node_num)
+		teleport_vector[teleport_set] = 1 / teleport_set_size
 		final_rank_vector = np.zeros(self.node_num)
-		initial_rank_vector = np.fromiter(
-			[1/teleport_set_size if node in teleport_set else 0 for node in
-				range(self.node_num)], dtype='float')
+		initial_rank_vector = teleport_vector
 		
 		while(iterations < self.MAX_ITERATIONS and diff > self.epsilon):
-			new_rank_vector = np.zeros(self.node_num)
-			for parent in self.edges:
-				for child in self.edges[parent]:
-					new_rank_vector[child] += (initial_rank_vector[parent] /
-						len(self.edges[parent]))
-
-			leaked_rank = (1 - sum(new_rank_vector)) / teleport_set_size
-			leaked_rank_vector = np.array([leaked_rank if node in teleport_set
-				else 0 for node in range(self.node_num)])
-			
-			final_rank_vector = new_rank_vector + leaked_rank_vector
-			diff = sum(abs(final_rank_vector - initial_rank_vector))
+			new_rank_vector = self.beta * (transition_matrix @
+				initial_rank_vector)
+
+			leaked_mass = self.beta - new_rank_vector.sum()
+			final_rank_vector = new_rank_vector + (1 - self.beta + leaked_mass
+				) * teleport_vector
+			diff = result.update(final_rank_vector, initial_rank_vector,
+				leaked_mass)
 			initial_rank_vector = final_rank_vector
 			
 			iterations += 1
 			print("TrustRank iteration: " + str(iterations))
-			print(final_rank_vector)
-			pg.plot(9, final_rank_vector)
+			if self.plot:
+				pg.plot(min(9, self.node_num), final_rank_vector)
 
-		return final_rank_vector
+		self.results.append(result.finish(graph.to_original(
+			final_rank_vector), iterations))
+		return result.rank_vector
 
 	def trustRank(self):
 		"""Utility function which calls other functions in a specific order.
@@ -167,4 +212,172 @@ class TrustRank:
 		trusted_pages = self.get_trustedPages()
 		print("got seed set...")
 		final_rank_vector = self.get_topicSpecificRank(trusted_pages)
-		return final_rank_vector
\ No newline at end of file
+		return final_rank_vector
+
+	def get_seedPages(self, seed_file):
+		"""Reads a set of seed pages from a file.
+
+		
+		Parameters
+		----------
+		seed_file : string
+			Path to a file containing node numbers separated by whitespace.
+			Lines starting with `#` or `//` are comments.
+
+		
+		Returns
+		-------
+		seed_pages : list of int
+			Seed pages identified by their node number, without duplicates.
+
+		"""
+		return readPages(seed_file)
+
+	def batch_topicSpecificRank(self, seed_sets, reverse=False):
+		"""Calculates TrustRank for many seed sets in one batched propagation.
+
+		Rank vectors of all seed sets are the columns of one matrix, so each
+		iteration is a single sparse matrix product for the whole batch.
+		Iterations stop once every column has converged, i.e. the residual
+		is the largest residual of any column.
+
+		
+		Parameters
+		----------
+		seed_sets : list of list of int
+			Each inner list is a teleport set.
+
+		reverse : bool, optional
+			Propagate along reversed edges, i.e. from a page to the pages
+			linking to it (used for anti-trust).
+			Default value : False
+
+		
+		Returns
+		-------
+		rank_vectors : numpy.ndarray [2-dimensional, dtype=float, 
+			shape = (n x k), n is `node_num`, k is `len(seed_sets)`]
+			Column `i` contains TrustRank of each node wrt `seed_sets[i]`.
+
+		"""
+		graph = csrGraph.from_edges(self.edges, self.node_num)
+		if reverse:
+			graph = graph.get_transpose()
+		transition_matrix = graph.get_transitionMatrix()
+		result = rankResult('AntiTrustRank' if reverse else 'TrustRank',
+			self.epsilon, self.MAX_ITERATIONS, self.norm, self.top_k)
+
+		teleport_vectors = np.zeros((self.node_num, len(seed_sets)))
+		for (column, seed_set) in enumerate(seed_sets):
+			teleport_vectors[graph.from_original(seed_set), column] = 1 / len(
+				seed_set)
+
+		diff = math.inf
+		iterations = 0
+		initial_rank_vectors = teleport_vectors
+		final_rank_vectors = teleport_vectors
+
+		while(iterations < self.MAX_ITERATIONS and diff > self.epsilon):
+			new_rank_vectors = self.beta * (transition_matrix @
+				initial_rank_vectors)
+			leaked_masses = self.beta - new_rank_vectors.sum(axis=0)
+
+			final_rank_vectors = new_rank_vectors + (teleport_vectors * 
+				(1 - self.beta + leaked_masses))
+			diff = result.update(final_rank_vectors, initial_rank_vectors,
+				leaked_masses)
+			initial_rank_vectors = final_rank_vectors
+
+			iterations += 1
+			print("TrustRank iteration: " + str(iterations))
+
+		self.results.append(result.finish(graph.to_original(
+			final_rank_vectors), iterations))
+		return result.rank_vector
+
+	def batch_trustRank(self, good_seed_files, spam_seed_files=()):
+		"""Calculates trust and anti-trust of each node for many seed files.
+
+		Trust propagates forward from good seed pages. Anti-trust propagates
+		backwards (on the reversed web-graph) from spam seed pages, so pages
+		linking to spam get distrusted. Raises ValueError (naming the seed
+		file) if a seed file has no pages or a page not in the web-graph.
+
+		
+		Parameters
+		----------
+		good_seed_files : list of string
+			Paths of files each containing a set of trusted pages.
+
+		spam_seed_files : list of string, optional
+			Paths of files each containing a set of known spam pages.
+			Default value : ()
+
+		
+		Returns
+		-------
+		trust_vectors : numpy.ndarray [2-dimensional, dtype=float, 
+			shape = (n x len(good_seed_files))]
+			Column `i` contains TrustRank wrt `good_seed_files[i]`.
+
+		antitrust_vectors : numpy.ndarray [2-dimensional, dtype=float, 
+			shape = (n x len(spam_seed_files))]
+			Column `i` contains Anti-TrustRank wrt `spam_seed_files[i]`.
+
+		"""
+		good_seed_sets = [self.get_seedPages(seed_file)
+			for seed_file in good_seed_files]
+		spam_seed_sets = [self.get_seedPages(seed_file)
+			for seed_file in spam_seed_files]
+		for (seed_file, seed_set) in zip(list(good_seed_files) +
+			list(spam_seed_files), good_seed_sets + spam_seed_sets):
+			if not seed_set:
+				raise ValueError(str(seed_file) + ": no seed pages")
+			if min(seed_set) < 0 or max(seed_set) >= self.node_num:
+				raise ValueError(str(seed_file) + ": seed pages must be node "
+					"numbers from 0 to " + str(self.node_num - 1))
+
+		trust_vectors = self.batch_topicSpecificRank(good_seed_sets)
+		if spam_seed_sets:
+			antitrust_vectors = self.batch_topicSpecificRank(spam_seed_sets,
+				reverse=True)
+		else:
+			antitrust_vectors = np.zeros((self.node_num, 0))
+		return (trust_vectors, antitrust_vectors)
+
+	def get_spamMass(self, trust_vectors, seed_set_sizes):
+		"""Calculates relative spam mass of each node.
+
+		Spam mass of a page is the share of its PageRank which does not come
+		from trusted pages. TrustRank sums up to 1 over the seed set while
+		PageRank sums up to 1 over all pages, so TrustRank is first scaled
+		by `len(seed_set) / node_num`; this is the PageRank contributed by
+		the seed pages (good core) alone, as in spam mass estimation.
+		Spam mass is then (PageRank - scaled TrustRank) / PageRank. Pages
+		with zero PageRank have zero spam mass.
+
+		
+		Parameters
+		----------
+		trust_vectors : numpy.ndarray [1 or 2-dimensional, dtype=float]
+			TrustRank of each node, one column per seed set.
+
+		seed_set_sizes : int or list of int
+			Number of pages in the seed set of each column.
+
+		
+		Returns
+		-------
+		spam_mass : numpy.ndarray [same shape as `trust_vectors`]
+			Relative spam mass of each node wrt each seed set.
+
+		"""
+		PageRank_vector = np.asarray(self.PageRank_vector, dtype='float')
+		if trust_vectors.ndim == 2:
+			PageRank_vector = PageRank_vector[:, np.newaxis]
+		PageRank_vector = np.broadcast_to(PageRank_vector, trust_vectors.shape)
+		core_vectors = trust_vectors * (np.asarray(seed_set_sizes) /
+			self.node_num)
+
+		return np.divide(PageRank_vector - core_vectors, PageRank_vector,
+			out=np.zeros(trust_vectors.shape), where=PageRank_vector > 0)
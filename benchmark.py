@@ -0,0 +1,90 @@
+import time
+import argparse
+import numpy as np
+from graphs import getGraph
+
+
+def get_syntheticGraph(node_num, edge_num, seed=0):
+	"""Generates a random web-graph with power-law in- and out-degrees.
+
+	Node numbers are shuffled, so (like in crawled graphs) linked nodes are
+	scattered over the whole rank vector.
+
+
+	Parameters
+	----------
+	node_num : int
+		Number of nodes in the web-graph.
+
+	edge_num : int
+		Number of edges in the web-graph.
+
+	seed : int, optional
+		Seed of the random number generator.
+		Default value : 0
+
+
+	Returns
+	-------
+	graph : graphs.csrGraph
+		The generated web-graph.
+
+	"""
+	rng = np.random.default_rng(seed)
+	labels = rng.permutation(node_num)
+
+	def power_law_nodes(exponent):
+		nodes = np.empty(0, dtype=np.int64)
+		while len(nodes) < edge_num:
+			drawn = rng.zipf(exponent, edge_num) - 1
+			nodes = np.concatenate((nodes, drawn[drawn < node_num]))
+		return labels[nodes[:edge_num]]
+
+	sources = power_law_nodes(1.8)
+	targets = power_law_nodes(1.6)
+	return getGraph.merge_shards([(sources, targets, None)], node_num)
+
+
+def time_iterations(graph, iterations):
+	"""Returns the mean time (seconds) of one rank propagation step."""
+	transition_matrix = graph.get_transitionMatrix()
+	rank_vector = np.full(graph.node_num, 1 / graph.node_num)
+	transition_matrix @ rank_vector
+
+	start = time.perf_counter()
+	for _ in range(iterations):
+		rank_vector = transition_matrix @ rank_vector
+	return (time.perf_counter() - start) / iterations
+
+
+def run(node_num, edge_num, iterations=20):
+	"""Prints the per-iteration time of each node ordering."""
+	graph = get_syntheticGraph(node_num, edge_num)
+	print("nodes: " + str(node_num) + "  edges: " + str(edge_num))
+
+	layouts = [('original', lambda: graph),
+		('degree', lambda: graph.reorder('degree')),
+		('bfs', lambda: graph.reorder('bfs'))]
+
+	baseline = None
+	print("layout\treorder (s)\titeration (ms)\tspeedup")
+	for (name, build) in layouts:
+		start = time.perf_counter()
+		layout = build()
+		reorder_time = time.perf_counter() - start
+
+		iteration_time = time_iterations(layout, iterations)
+		baseline = baseline or iteration_time
+		print(name + '\t' + format(reorder_time, '.2f') + '\t' +
+			format(iteration_time * 1000, '.2f') + '\t' +
+			format(baseline / iteration_time, '.2f') + 'x')
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description="Per-iteration time of rank "
+		"propagation with and without node reordering.")
+	parser.add_argument('--nodes', type=int, default=2394385)
+	parser.add_argument('--edges', type=int, default=5021410)
+	parser.add_argument('--iterations', type=int, default=20)
+	args = parser.parse_args()
+	run(args.nodes, args.edges, args.iterations)
@@ -0,0 +1,260 @@
+import os
+import time
+import zlib
+import zipfile
+import threading
+import numpy as np
+
+
+HEADER_SIZE = 6
+
+
+class rankCheckpoint:
+	"""Saves and restores the state of a power iteration.
+
+	Every state is kept in its own memory-mapped `.npy` file named after
+	the run it belongs to (e.g. one file per topic). A new state is first
+	written to a temporary file in a background thread and then atomically
+	renamed over the previous one, so the file on disk is always a complete
+	checkpoint. Resuming from a state and iterating on gives bit-identical
+	rank vectors, as long as the graph and parameters are the same.
+
+	...
+
+	Parameters
+	----------
+	directory : string
+		Directory in which checkpoint files are kept.
+
+	every_iterations : int, optional
+		Save the state after every `every_iterations` iterations.
+		Default value : None
+
+	every_seconds : float, optional
+		Save the state if `every_seconds` seconds have passed since the last
+		save.
+		Default value : None
+
+	resume : bool, optional
+		Continue from the saved states instead of starting afresh.
+		Default value : False
+
+
+	Methods
+	-------
+	get_key(*parameters)
+		Fingerprint of the parameters a run depends on.
+
+	get_graphKey(graph)
+		Fingerprint of the web-graph a run works on.
+
+	is_due(iterations)
+		Tells whether the state after `iterations` iterations should be saved.
+
+	save(name, key, iterations, diff, rank_vector, finished=False)
+		Saves the state of run `name` in the background.
+
+	load(name, key, node_num)
+		Returns the saved state of run `name`, if there is a valid one.
+
+	wait()
+		Blocks until the last background save is on disk.
+
+	"""
+	def __init__(self, directory, every_iterations=None, every_seconds=None,
+		resume=False):
+		self.directory = directory
+		self.every_iterations = every_iterations
+		self.every_seconds = every_seconds
+		self.resume = resume
+		self.last_save = time.monotonic()
+		self.writer = None
+		os.makedirs(directory, exist_ok=True)
+
+
+	def get_path(self, name):
+		"""Returns path of the checkpoint file of run `name`."""
+		return os.path.join(self.directory, name + '.npy')
+
+
+	def get_key(self, *parameters):
+		"""Fingerprint of the parameters a run depends on.
+
+
+		Parameters
+		----------
+		*parameters : any
+			Values (beta, teleport set, ...) which must be the same for a
+			saved state to be resumed.
+
+
+		Returns
+		-------
+		key : int
+			CRC-32 of the parameters.
+
+		"""
+		return zlib.crc32(repr(parameters).encode())
+
+
+	def get_graphKey(self, graph):
+		"""Fingerprint of the web-graph a run works on.
+
+
+		Parameters
+		----------
+		graph : graphs.csrGraph
+			The web-graph.
+
+
+		Returns
+		-------
+		key : int
+			CRC-32 of the links, weights and node order of `graph`, to be
+			passed on to `get_key()`.
+
+		"""
+		key = zlib.crc32(np.asarray(graph.offsets, dtype=np.int64))
+		key = zlib.crc32(np.asarray(graph.targets, dtype=np.int64), key)
+		if graph.weights is not None:
+			key = zlib.crc32(np.asarray(graph.weights, dtype='float'), key)
+		if graph.permutation is not None:
+			# rank vectors are saved in the (relabelled) order of `graph`
+			key = zlib.crc32(np.asarray(graph.permutation, dtype=np.int64),
+				key)
+		return key
+
+
+	def is_due(self, iterations):
+		"""Tells whether the state after `iterations` iterations should be saved.
+
+
+		Parameters
+		----------
+		iterations : int
+			Number of iterations done so far.
+
+
+		Returns
+		-------
+		due : bool
+			True if either the iteration or the wall time interval is over.
+
+		"""
+		if self.every_iterations and iterations % self.every_iterations == 0:
+			return True
+		if self.every_seconds is not None:
+			return time.monotonic() - self.last_save >= self.every_seconds
+		return False
+
+
+	def save(self, name, key, iterations, diff, rank_vector, finished=False):
+		"""Saves the state of run `name` in the background.
+
+		Waits for the previous save to finish first, so at most one state
+		is being written at a time.
+
+
+		Parameters
+		----------
+		name : string
+			Name of the run, used as file name.
+
+		key : int
+			Fingerprint of the parameters of the run, see `get_key()`.
+
+		iterations : int
+			Number of iterations done so far.
+
+		diff : float
+			Total error in ranks after the last iteration.
+
+		rank_vector : numpy.ndarray [1-dimensional, dtype=float]
+			Rank vector after the last iteration.
+
+		finished : bool, optional
+			True if the run has converged or reached `MAX_ITERATIONS`.
+			Default value : False
+
+
+		Returns
+		-------
+		None
+
+		"""
+		self.wait()
+		rank_vector = np.array(rank_vector, dtype='float')
+		header = [len(rank_vector), iterations, diff, float(finished),
+			zlib.crc32(rank_vector.tobytes()), key]
+
+		self.writer = threading.Thread(target=self.write,
+			args=(self.get_path(name), header, rank_vector))
+		self.writer.start()
+		self.last_save = time.monotonic()
+
+
+	def write(self, path, header, rank_vector):
+		"""Writes a checkpoint file atomically."""
+		temp_path = path + '.tmp'
+		checkpoint = np.lib.format.open_memmap(temp_path, mode='w+',
+			dtype='float', shape=(HEADER_SIZE + len(rank_vector),))
+		checkpoint[:HEADER_SIZE] = header
+		checkpoint[HEADER_SIZE:] = rank_vector
+		checkpoint.flush()
+		del checkpoint
+
+		with open(temp_path, 'rb') as c_file:
+			os.fsync(c_file.fileno())
+		os.replace(temp_path, path)
+
+
+	def load(self, name, key, node_num):
+		"""Returns the saved state of run `name`, if there is a valid one.
+
+
+		Parameters
+		----------
+		name : string
+			Name of the run, used as file name.
+
+		key : int
+			Fingerprint of the parameters of the run, see `get_key()`.
+
+		node_num : int
+			Number of nodes in the web-graph.
+
+
+		Returns
+		-------
+		state : tuple (int, float, numpy.ndarray, bool) or None
+			(iterations, diff, rank_vector, finished) of the saved state.
+			None if resuming is off, nothing is saved, or the saved state
+			belongs to other parameters or is damaged.
+
+		"""
+		self.wait()
+		path = self.get_path(name)
+		if not self.resume or not os.path.exists(path):
+			return None
+
+		try:
+			checkpoint = np.load(path, mmap_mode='r')
+		except (ValueError, OSError, EOFError, zipfile.BadZipFile):
+			return None
+		if getattr(checkpoint, 'shape', None) != (HEADER_SIZE + node_num,):
+			return None
+
+		size, iterations, diff, finished, crc, saved_key = checkpoint[
+			:HEADER_SIZE]
+		rank_vector = np.array(checkpoint[HEADER_SIZE:])
+		if (size != node_num or saved_key != key or
+			crc != zlib.crc32(rank_vector.tobytes())):
+			return None
+		return (int(iterations), float(diff), rank_vector, bool(finished))
+
+
+	def wait(self):
+		"""Blocks until the last background save is on disk."""
+		if self.writer is not None:
+			self.writer.join()
+			self.writer = None
@@ -0,0 +1,198 @@
+import math
+import warnings
+import numpy as np
+from topk import streamingTopK
+
+
+NORMS = ('l1', 'linf', 'topk')
+
+
+class rankResult:
+	"""Convergence report of a power iteration.
+
+	Solvers feed every iteration to `update()`, which measures the change
+	of the rank vector under the chosen norm and records the rank mass
+	lost through dead-ends (which the solvers give back to the teleport
+	set, along with teleports). `finish()` tells whether the run
+	converged and warns if it stopped at `MAX_ITERATIONS` instead.
+
+	...
+
+	Parameters
+	----------
+	name : string
+		Name of the run, used in warnings.
+
+	epsilon : float
+		A small value and residual should be less than epsilon.
+
+	max_iterations : int
+		Maximum number of times to apply power iteration.
+
+	norm : {'l1', 'linf', 'topk'}, optional
+		'l1' : total change in ranks.
+		'linf' : largest change in rank of a node.
+		'topk' : number of places of the `top_k` ranking which changed,
+			i.e. iterations stop once the top `top_k` nodes are stable.
+		Default value : 'l1'
+
+	top_k : int, optional
+		Length of the ranking compared by the 'topk' norm.
+		Default value : 10
+
+
+	Attributes
+	----------
+	rank_vector : numpy.ndarray
+		Final rank vector (set by `finish()`).
+
+	converged : bool
+		True if the residual dropped to `epsilon` or below.
+
+	iterations : int
+		Number of iterations done.
+
+	residual : float
+		Residual of the last iteration.
+
+	residuals : list of float
+		Residual of every iteration (since the last resume).
+
+	leaked_mass : list of float
+		Rank mass lost through dead-ends in every iteration (since the last
+		resume); a `numpy.ndarray` per iteration for a batch.
+
+
+	Methods
+	-------
+	get_residual(final_rank_vector, initial_rank_vector)
+		Measures the change between two iterations under `norm`.
+
+	update(final_rank_vector, initial_rank_vector, leaked_mass=0.0)
+		Records one iteration and returns its residual.
+
+	finish(rank_vector, iterations)
+		Closes the report once iterations stop.
+
+	"""
+	def __init__(self, name, epsilon, max_iterations, norm='l1', top_k=10):
+		if norm not in NORMS:
+			raise ValueError("unknown norm: " + str(norm))
+		self.name = name
+		self.epsilon = epsilon
+		self.MAX_ITERATIONS = max_iterations
+		self.norm = norm
+		self.top_k = top_k
+
+		self.rank_vector = None
+		self.converged = False
+		self.iterations = 0
+		self.residual = math.inf
+		self.residuals = []
+		self.leaked_mass = []
+		self.previous_topK = None
+
+
+	def get_topK(self, rank_vectors):
+		"""Returns the top `top_k` nodes of every column of `rank_vectors`."""
+		return [[node for (_, node) in streamingTopK(self.top_k).feed(
+			rank_vector).get_topK()] for rank_vector in rank_vectors.T]
+
+
+	def get_residual(self, final_rank_vector, initial_rank_vector):
+		"""Measures the change between two iterations under `norm`.
+
+
+		Parameters
+		----------
+		final_rank_vector, initial_rank_vector : numpy.ndarray
+			[1 or 2-dimensional, dtype=float]
+			Rank vectors after and before the iteration (one column per
+			rank vector of a batch).
+
+
+		Returns
+		-------
+		residual : float
+			The change; for a batch, the largest change of any column.
+
+		"""
+		if self.norm == 'l1':
+			return float(np.abs(final_rank_vector - initial_rank_vector).sum(
+				axis=0).max())
+		if self.norm == 'linf':
+			return float(np.abs(final_rank_vector - initial_rank_vector).max())
+
+		topK = self.get_topK(final_rank_vector.reshape(len(final_rank_vector),
+			-1))
+		previous_topK = self.previous_topK
+		self.previous_topK = topK
+		if previous_topK is None:
+			return float(self.top_k)
+		return float(max(sum(node != previous_node for (node, previous_node)
+			in zip(nodes, previous_nodes)) for (nodes, previous_nodes) in
+			zip(topK, previous_topK)))
+
+
+	def update(self, final_rank_vector, initial_rank_vector, leaked_mass=0.0):
+		"""Records one iteration and returns its residual.
+
+
+		Parameters
+		----------
+		final_rank_vector, initial_rank_vector : numpy.ndarray
+			Rank vectors after and before the iteration.
+
+		leaked_mass : float or numpy.ndarray, optional
+			Rank mass lost through dead-ends in the iteration (one value per
+			column for a batch).
+			Default value : 0.0
+
+
+		Returns
+		-------
+		residual : float
+			See `get_residual()`.
+
+		"""
+		self.residual = self.get_residual(final_rank_vector,
+			initial_rank_vector)
+		self.residuals.append(self.residual)
+		self.leaked_mass.append(leaked_mass)
+		return self.residual
+
+
+	def finish(self, rank_vector, iterations):
+		"""Closes the report once iterations stop.
+
+
+		Parameters
+		----------
+		rank_vector : numpy.ndarray
+			Final rank vector.
+
+		iterations : int
+			Number of iterations done.
+
+
+		Returns
+		-------
+		self : rankResult
+
+		"""
+		self.rank_vector = rank_vector
+		self.iterations = iterations
+		self.converged = self.residual <= self.epsilon
+		if not self.converged:
+			warnings.warn(self.name + " did not converge in " + str(iterations)
+				+ " iterations (" + self.norm + " residual " +
+				format(self.residual, '.3g') + ")", RuntimeWarning,
+				stacklevel=3)
+		return self
+
+
+	def __repr__(self):
+		return (self.name + ": " + ("converged" if self.converged else
+			"not converged") + " after " + str(self.iterations) +
+			" iterations, " + self.norm + " residual " +
+			format(self.residual, '.3g'))
@@ -1,7 +1,558 @@
-import heapq
+import os
+import gzip
+import functools
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
-from collections import defaultdict
+from matplotlib.figure import Figure
+from topk import streamingTopK
+from collections import defaultdict, deque
+from scipy.sparse import csr_matrix as SparseMatrix
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _count_lines(block):
+	"""Number of non-empty lines in `block`."""
+	characters = np.frombuffer(block.translate(None, b' \t\r\v\f'),
+		dtype=np.uint8)
+	newlines = characters == ord('\n')
+	return int(np.count_nonzero(~newlines[1:] & newlines[:-1]) +
+		(len(characters) > 0 and not newlines[0]))
+
+
+def _parse_block(block, weighted=False, edge_file=None):
+	"""Parses a block of complete lines into source, target and weight arrays.
+
+	Lines starting with `#` or `//` are treated as comments. Weights are
+	read from a third column if `weighted`, otherwise they are None.
+	Raises ValueError (naming `edge_file`) unless every non-empty line has
+	as many values as an edge needs.
+	"""
+	if b'#' in block or b'/' in block:
+		block = b'\n'.join(line for line in block.splitlines()
+			if not line.lstrip().startswith((b'#', b'//')))
+	fields = 3 if weighted else 2
+	values = np.fromstring(block, dtype=np.int64 if fields == 2 else 'float',
+		sep=' ')
+	if len(values) != fields * _count_lines(block):
+		if weighted:
+			raise ValueError(str(edge_file) + ": every edge needs a source, "
+				"a target and a weight")
+		raise ValueError(str(edge_file) + ": every edge needs a source and "
+			"a target")
+
+	if not weighted:
+		return (values[0::2], values[1::2], None)
+	return (values[0::3].astype(np.int64), values[1::3].astype(np.int64),
+		values[2::3])
+
+
+def _parse_shard(shard, weighted=False):
+	"""Reads the byte range `shard` = (edge_file, start, end) and parses it."""
+	edge_file, start, end = shard
+	with open(edge_file, 'rb') as e_file:
+		e_file.seek(start)
+		block = e_file.read(end - start)
+	return _parse_block(block, weighted, edge_file)
+
+
+def readPages(page_file):
+	"""Reads a set of pages (node numbers) from a file.
+
+
+	Parameters
+	----------
+	page_file : string
+		Path to a file containing node numbers separated by whitespace.
+		Lines starting with `#` or `//` are comments.
+
+
+	Returns
+	-------
+	pages : list of int
+		Pages identified by their node number, without duplicates.
+
+	"""
+	pages = []
+	with open(page_file, 'r') as p_file:
+		for line in p_file:
+			if not line.lstrip().startswith(('#', '//')):
+				pages.extend(int(node) for node in line.split())
+	return list(dict.fromkeys(pages))
+
+
+def _index_dtype(size):
+	"""Smallest integer dtype able to index `size` entries."""
+	if size <= np.iinfo(np.int32).max:
+		return np.int32
+	return np.int64
+
+
+class csrGraph:
+	"""Web-graph stored in Compressed Sparse Row (CSR) form.
+
+	Children of `node` are `targets[offsets[node]:offsets[node + 1]]`.
+	Supports the same `graph[node]`, `iter(graph)` and `len(graph)` access
+	as the adjacency list returned by `getGraph.get_connections()`, so it
+	can be passed wherever `edges` is expected.
+
+	Edges may carry weights. Rank of a page is then split among its
+	children in proportion to the weights instead of equally. Weights are
+	normalized per parent once, when the graph is built.
+
+	Nodes may be relabelled for locality (see `reorder()`). Node numbers of
+	such a graph are internal; `to_original()` and `from_original()`
+	convert between them and the node numbers of the edge_file.
+
+	...
+
+	Parameters
+	----------
+	offsets : numpy.ndarray [1-dimensional, dtype=int, size=node_num+1]
+		Start of the children of each node in `targets`.
+
+	targets : numpy.ndarray [1-dimensional, dtype=int]
+		Children of all nodes, grouped by parent.
+
+	node_num : int
+		Number of nodes in the web-graph.
+
+	weights : numpy.ndarray [1-dimensional, dtype=float], optional
+		Weight of each edge, in the same order as `targets`.
+		Default value : None (rank is split equally among children)
+
+	permutation : numpy.ndarray [1-dimensional, dtype=int], optional
+		Original node number of each node, if nodes were relabelled.
+		Default value : None (nodes are not relabelled)
+
+
+	Methods
+	-------
+	from_edges(edges, node_num)
+		Builds a csrGraph from an adjacency list.
+
+	load(graph_file)
+		Loads a csrGraph saved by `save()`.
+
+	save(graph_file)
+		Saves the csrGraph to a binary `.npz` file.
+
+	get_outDegrees()
+		Returns the number of children of each node.
+
+	get_transpose()
+		Returns the web-graph with every edge reversed (built once, cached).
+
+	get_transitionMatrix()
+		Returns the column-stochastic link matrix (built once, cached).
+
+	get_adjacencyMatrix()
+		Returns the (weighted) adjacency matrix of the web-graph.
+
+	get_reordering(method='degree')
+		Returns an order of nodes in which linked nodes are close together.
+
+	reorder(method='degree')
+		Returns the web-graph with nodes relabelled for memory locality.
+
+	to_original(rank_vector)
+		Puts a rank vector of this graph in original node order.
+
+	from_original(nodes)
+		Converts original node numbers to node numbers of this graph.
+
+	"""
+	def __init__(self, offsets, targets, node_num, weights=None,
+		permutation=None):
+		self.offsets = offsets
+		self.targets = targets
+		self.node_num = node_num
+		self.weights = weights
+		self.permutation = permutation
+		self.inverse_permutation = None
+		self.transposed_graph = None
+		self.transition_matrix = None
+
+		if weights is not None:
+			degrees = self.get_outDegrees()
+			weight_sums = np.bincount(np.repeat(np.arange(node_num), degrees),
+				weights=weights, minlength=node_num)
+			self.weights = weights / np.repeat(np.where(weight_sums > 0,
+				weight_sums, 1), degrees)
+
+
+	@classmethod
+	def from_edges(cls, edges, node_num):
+		"""Builds a csrGraph from an adjacency list.
+
+
+		Parameters
+		----------
+		edges : collections.defaltdict(list)
+			Adjacency list containing information of connections in web-graph.
+
+		node_num : int
+			Number of nodes in the web-graph.
+
+
+		Returns
+		-------
+		graph : csrGraph
+			Same web-graph in CSR form. Order of children is preserved.
+			If `edges` already is a csrGraph it is returned as it is.
+
+		"""
+		if isinstance(edges, csrGraph):
+			return edges
+
+		degrees = np.zeros(node_num, dtype=np.int64)
+		for parent in edges:
+			degrees[parent] = len(edges[parent])
+		offsets = np.zeros(node_num + 1, dtype=np.int64)
+		np.cumsum(degrees, out=offsets[1:])
+
+		targets = np.empty(offsets[-1], dtype=_index_dtype(node_num))
+		for parent in edges:
+			targets[offsets[parent]:offsets[parent + 1]] = edges[parent]
+		return cls(offsets, targets, node_num)
+
+
+	@classmethod
+	def load(cls, graph_file):
+		"""Loads a csrGraph saved by `save()`.
+
+
+		Parameters
+		----------
+		graph_file : string
+			Path to the `.npz` file.
+
+
+		Returns
+		-------
+		graph : csrGraph
+			The saved web-graph.
+
+		"""
+		with np.load(graph_file) as saved:
+			weights = saved['weights'] if 'weights' in saved else None
+			permutation = (saved['permutation'] if 'permutation' in saved
+				else None)
+			return cls(saved['offsets'], saved['targets'],
+				int(saved['node_num']), weights, permutation)
+
+
+	def save(self, graph_file):
+		"""Saves the csrGraph to a binary `.npz` file.
+
+		Loading it back with `load()` is much faster than parsing the
+		edge_file again.
+
+
+		Parameters
+		----------
+		graph_file : string
+			Path of the `.npz` file.
+
+
+		Returns
+		-------
+		None
+
+		"""
+		arrays = {'offsets': self.offsets, 'targets': self.targets,
+			'node_num': np.array(self.node_num)}
+		if self.weights is not None:
+			arrays['weights'] = self.weights
+		if self.permutation is not None:
+			arrays['permutation'] = self.permutation
+		np.savez(graph_file, **arrays)
+
+
+	def get_outDegrees(self):
+		"""Returns the number of children of each node.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		degrees : numpy.ndarray [1-dimensional, dtype=int]
+			Out-degree of each node in the web-graph.
+
+		"""
+		return np.diff(self.offsets)
+
+
+	def get_transpose(self):
+		"""Returns the web-graph with every edge reversed.
+
+		The transpose is built on first use and cached, so every solver
+		working on this graph shares it.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		graph : csrGraph
+			Children of a node in the returned graph are its parents in this
+			graph, ordered by parent. Edge weights (if any) are carried over
+			and normalized again per (new) parent.
+
+		"""
+		if self.transposed_graph is not None:
+			return self.transposed_graph
+
+		sources = np.repeat(np.arange(self.node_num,
+			dtype=self.targets.dtype), self.get_outDegrees())
+		order = np.argsort(self.targets, kind='stable')
+
+		offsets = np.zeros(self.node_num + 1, dtype=np.int64)
+		np.cumsum(np.bincount(self.targets, minlength=self.node_num),
+			out=offsets[1:])
+		weights = None if self.weights is None else self.weights[order]
+
+		self.transposed_graph = csrGraph(offsets, sources[order], self.node_num,
+			weights, self.permutation)
+		return self.transposed_graph
+
+
+	def get_transitionMatrix(self):
+		"""Returns the column-stochastic link matrix used in power iteration.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		transition_matrix : scipy.sparse matrix [shape = (n x n), n is 
+							`node_num`]
+			Entry (child, parent) is the normalized weight of the edge, or
+			1 / out-degree of parent for unweighted graphs. Columns of
+			dead-ends are all zero.
+
+		"""
+		if self.transition_matrix is not None:
+			return self.transition_matrix
+
+		if self.weights is None:
+			degrees = self.get_outDegrees()
+			data = np.repeat(1 / np.maximum(degrees, 1), degrees)
+		else:
+			data = self.weights
+		self.transition_matrix = SparseMatrix((data, self.targets,
+			self.offsets), shape=(self.node_num, self.node_num)).transpose()
+		return self.transition_matrix
+
+
+	def get_adjacencyMatrix(self):
+		"""Returns the (weighted) adjacency matrix of the web-graph.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		adjacency_matrix : scipy.sparse.csr_matrix [shape = (n x n), n is 
+							`node_num`]
+			Entry (parent, child) is the normalized weight of the edge, or 1
+			for unweighted graphs.
+
+		"""
+		if self.weights is None:
+			data = np.ones(len(self.targets))
+		else:
+			data = self.weights
+		return SparseMatrix((data, self.targets, self.offsets),
+			shape=(self.node_num, self.node_num))
+
+
+	def get_reordering(self, method='degree'):
+		"""Returns an order of nodes in which linked nodes are close together.
+
+
+		Parameters
+		----------
+		method : {'degree', 'bfs'}, optional
+			'degree' : nodes with most (in + out) links first, so the
+				heavily used part of a rank vector is packed together.
+			'bfs' : breadth-first order over the undirected web-graph,
+				starting from the node with most links of each component,
+				so neighbours get nearby numbers.
+			Default value : 'degree'
+
+
+		Returns
+		-------
+		order : numpy.ndarray [1-dimensional, dtype=int]
+			Node numbers of this graph in their new order.
+
+		"""
+		degrees = self.get_outDegrees() + np.bincount(self.targets,
+			minlength=self.node_num)
+		by_degree = np.argsort(-degrees, kind='stable')
+		if method == 'degree':
+			return by_degree
+		if method != 'bfs':
+			raise ValueError("unknown reordering method: " + str(method))
+
+		adjacency_matrix = SparseMatrix((np.ones(len(self.targets)),
+			self.targets, self.offsets), shape=(self.node_num, self.node_num))
+		undirected_matrix = (adjacency_matrix + adjacency_matrix.transpose()
+			).tocsr()
+		indptr, indices = undirected_matrix.indptr, undirected_matrix.indices
+
+		visited = np.zeros(self.node_num, dtype=bool)
+		order = np.empty(self.node_num, dtype=np.int64)
+		count = 0
+		for root in by_degree:
+			if degrees[root] == 0:
+				break
+			if visited[root]:
+				continue
+			visited[root] = True
+			frontier = np.array([root])
+			while len(frontier):
+				order[count:count + len(frontier)] = frontier
+				count += len(frontier)
+
+				# neighbours of the whole level at once, first seen first
+				starts = indptr[frontier]
+				lengths = indptr[frontier + 1] - starts
+				positions = np.arange(lengths.sum()) + np.repeat(starts -
+					(np.cumsum(lengths) - lengths), lengths)
+				neighbours = indices[positions]
+				neighbours = neighbours[~visited[neighbours]]
+				_, first = np.unique(neighbours, return_index=True)
+				frontier = neighbours[np.sort(first)]
+				visited[frontier] = True
+
+		# isolated nodes keep their relative order at the end
+		order[count:] = by_degree[~visited[by_degree]]
+		return order
+
+
+	def reorder(self, method='degree'):
+		"""Returns the web-graph with nodes relabelled for memory locality.
+
+		Scattering rank along edges touches nodes in node-number order of
+		their parents; relabelling keeps those accesses close together in
+		memory. Children of every node keep their order.
+
+
+		Parameters
+		----------
+		method : {'degree', 'bfs'}, optional
+			See `get_reordering()`.
+			Default value : 'degree'
+
+
+		Returns
+		-------
+		graph : csrGraph
+			Relabelled web-graph. Its `permutation` maps back to the node
+			numbers of this graph (or of its original, if this graph was
+			relabelled too).
+
+		"""
+		order = self.get_reordering(method)
+		new_number = np.empty(self.node_num, dtype=np.int64)
+		new_number[order] = np.arange(self.node_num)
+
+		degrees = self.get_outDegrees()
+		sources = new_number[np.repeat(np.arange(self.node_num), degrees)]
+		targets = new_number[self.targets]
+		edge_order = np.argsort(sources, kind='stable')
+
+		offsets = np.zeros(self.node_num + 1, dtype=np.int64)
+		np.cumsum(degrees[order], out=offsets[1:])
+		weights = None if self.weights is None else self.weights[edge_order]
+		permutation = order if self.permutation is None else (
+			self.permutation[order])
+
+		return csrGraph(offsets, targets[edge_order].astype(
+			self.targets.dtype), self.node_num, weights, permutation)
+
+
+	def to_original(self, rank_vector):
+		"""Puts a rank vector of this graph in original node order.
+
+
+		Parameters
+		----------
+		rank_vector : numpy.ndarray [1 or 2-dimensional, dtype=float]
+			Rank of each node of this graph (one row per node).
+
+
+		Returns
+		-------
+		rank_vector : numpy.ndarray [same shape as `rank_vector`]
+			Rank of each node in original node order.
+
+		"""
+		if self.permutation is None:
+			return rank_vector
+		original_vector = np.empty_like(rank_vector)
+		original_vector[self.permutation] = rank_vector
+		return original_vector
+
+
+	def from_original(self, nodes):
+		"""Converts original node numbers to node numbers of this graph.
+
+
+		Parameters
+		----------
+		nodes : list of int
+			Original node numbers (e.g. a teleport set).
+
+
+		Returns
+		-------
+		nodes : list of int
+			Node numbers in this graph.
+
+		"""
+		if self.permutation is None:
+			return nodes
+		if self.inverse_permutation is None:
+			self.inverse_permutation = np.empty(self.node_num, dtype=np.int64)
+			self.inverse_permutation[self.permutation] = np.arange(
+				self.node_num)
+		return self.inverse_permutation[np.asarray(nodes, 
+			dtype=np.int64)].tolist()
+
+
+	def __getitem__(self, node):
+		return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+	def __iter__(self):
+		return iter(np.flatnonzero(self.get_outDegrees()).tolist())
+
+	def __len__(self):
+		return int(np.count_nonzero(self.get_outDegrees()))
 
 
 class getGraph:
@@ -20,6 +571,13 @@ class getGraph:
 		Reads the edges from the edge_file and save it in adjacency list on 
 		RAM.
 
+	get_shards(shard_num)
+		Splits the edge_file into byte ranges aligned on line boundaries.
+
+	get_csrGraph(node_num=None, processes=None, block_size=1<<26, 
+		weighted=False)
+		Parses the edge_file in parallel and returns it as a csrGraph.
+
 	"""
 	def __init__(self, edge_file):
 		self.edge_file = edge_file
@@ -53,19 +611,243 @@ class getGraph:
 		return edges
 
 
+	def get_compression(self):
+		"""Returns 'gzip', 'zstd' or None depending on the edge_file header."""
+		with open(self.edge_file, 'rb') as e_file:
+			magic = e_file.read(4)
+		if magic.startswith(GZIP_MAGIC):
+			return 'gzip'
+		if magic.startswith(ZSTD_MAGIC):
+			return 'zstd'
+		return None
+
+
+	def get_shards(self, shard_num):
+		"""Splits the edge_file into byte ranges aligned on line boundaries.
+
+
+		Parameters
+		----------
+		shard_num : int
+			Number of (roughly equal) byte ranges to split the file into.
+
+
+		Returns
+		-------
+		shards : list of tuple [(string, int, int), ...]
+			(edge_file, start, end) of every non-empty byte range. Each range
+			starts at the beginning of a line and ends after a newline (or at
+			the end of the file).
+
+		"""
+		size = os.path.getsize(self.edge_file)
+		boundaries = [0]
+		with open(self.edge_file, 'rb') as e_file:
+			for shard in range(1, shard_num):
+				e_file.seek(max(size * shard // shard_num, boundaries[-1]))
+				e_file.readline()
+				boundaries.append(min(e_file.tell(), size))
+		boundaries.append(size)
+
+		return [(self.edge_file, start, end) for (start, end) in
+			zip(boundaries[:-1], boundaries[1:]) if end > start]
+
+
+	def get_compressedBlocks(self, block_size):
+		"""Decompresses the edge_file block by block.
+
+		Every yielded block ends on a line boundary so it can be parsed on
+		its own while the next block is being decompressed.
+		"""
+		compression = self.get_compression()
+		if compression == 'gzip':
+			stream = gzip.open(self.edge_file, 'rb')
+		else:
+			if zstandard is None:
+				raise ImportError("reading zstd-compressed edge files requires "
+					"the `zstandard` package")
+			stream = zstandard.ZstdDecompressor().stream_reader(
+				open(self.edge_file, 'rb'), closefd=True)
+
+		with stream:
+			remainder = b''
+			while True:
+				data = stream.read(block_size)
+				if not data:
+					break
+				data = remainder + data
+				cut = data.rfind(b'\n') + 1
+				remainder = data[cut:]
+				if cut:
+					yield data[:cut]
+		if remainder:
+			yield remainder
+
+
+	def get_csrGraph(self, node_num=None, processes=None, block_size=1<<26,
+		weighted=False):
+		"""Parses the edge_file in parallel and returns it as a csrGraph.
+
+		Plain files are split into byte ranges which are parsed by a pool of
+		worker processes. Compressed files (gzip, or zstd when `zstandard`
+		is installed) are decompressed block by block and each block is
+		handed to the pool as soon as it is available; decompression waits
+		while 2 blocks per process are still being parsed.
+		Parsed shards are merged with a stable sort, so children of every
+		node stay in the same order as in the edge_file.
+
+		
+		Parameters
+		----------
+		node_num : int, optional
+			Number of nodes in the web-graph.
+			Default value : largest node number in the edge_file + 1
+
+		processes : int, optional
+			Number of worker processes.
+			Default value : os.cpu_count()
+
+		block_size : int, optional
+			Size in bytes of the blocks read from a compressed edge_file.
+			Default value : 64 MiB
+
+		weighted : bool, optional
+			Read the weight of each edge from a third column.
+			Default value : False
+
+
+		Returns
+		-------
+		graph : csrGraph
+			Web-graph in CSR form.
+
+		"""
+		processes = processes or os.cpu_count() or 1
+		if self.get_compression() is None:
+			jobs = self.get_shards(processes)
+			parse = functools.partial(_parse_shard, weighted=weighted)
+		else:
+			jobs = self.get_compressedBlocks(block_size)
+			parse = functools.partial(_parse_block, weighted=weighted,
+				edge_file=self.edge_file)
+
+		if processes == 1:
+			parsed = [parse(job) for job in jobs]
+		else:
+			# at most 2 jobs per process in flight, so decompressed blocks
+			# are not all held in memory at once
+			parsed = []
+			pending = deque()
+			with ProcessPoolExecutor(processes) as executor:
+				for job in jobs:
+					if len(pending) == 2 * processes:
+						parsed.append(pending.popleft().result())
+					pending.append(executor.submit(parse, job))
+				parsed.extend(future.result() for future in pending)
+
+		return self.merge_shards(parsed, node_num)
+
+
+	@staticmethod
+	def merge_shards(parsed, node_num=None):
+		"""Merges parsed shards into a single csrGraph with a counting sort.
+
+		Out-degrees of all shards are counted into one array, which gives
+		the range of every parent in the CSR arrays. Shards are then
+		scattered in file order: edges of a shard are grouped by parent
+		(a stable counting sort) and written after the edges of earlier
+		shards, tracked by one cursor per parent. Children of every node
+		therefore keep their order in the file. Besides the edges, only
+		O(node_num) memory and the edges of one shard are used.
+
+
+		Parameters
+		----------
+		parsed : list of tuple [(numpy.ndarray, numpy.ndarray, 
+			numpy.ndarray or None), ...]
+			(sources, targets, weights) of every shard, in file order.
+
+		node_num : int, optional
+			Number of nodes in the web-graph.
+			Default value : largest node number in `parsed` + 1
+
+
+		Returns
+		-------
+		graph : csrGraph
+			Web-graph in CSR form.
+
+		"""
+		parsed = [shard for shard in parsed if len(shard[0])]
+		weighted = any(shard[2] is not None for shard in parsed)
+		largest_node = int(max([max(sources.max(), targets.max())
+			for (sources, targets, _) in parsed], default=-1))
+		if node_num is None:
+			node_num = largest_node + 1
+		elif largest_node >= node_num:
+			raise ValueError("node_num is " + str(node_num) + " but the "
+				"web-graph has node " + str(largest_node) + "; node_num must "
+				"be larger than every node number")
+
+		degrees = np.zeros(node_num, dtype=np.int64)
+		for (sources, _, _) in parsed:
+			degrees += np.bincount(sources, minlength=node_num)
+		offsets = np.zeros(node_num + 1, dtype=np.int64)
+		np.cumsum(degrees, out=offsets[1:])
+		del degrees
+
+		csr_targets = np.empty(offsets[-1], dtype=_index_dtype(node_num))
+		csr_weights = np.empty(offsets[-1]) if weighted else None
+		cursor = offsets[:-1].copy()
+		for (sources, targets, weights) in parsed:
+			# an (edges x node_num) matrix with one entry per edge, converted
+			# to CSC, lists the edges of each parent in file order
+			edge_num = len(sources)
+			grouped = SparseMatrix((np.ones(edge_num, dtype=np.int8), sources,
+				np.arange(edge_num + 1)), shape=(edge_num, node_num)).tocsc()
+			order = grouped.indices
+			grouped_sources = sources[order]
+			slots = (cursor[grouped_sources] + np.arange(edge_num) -
+				grouped.indptr[grouped_sources])
+			csr_targets[slots] = targets[order]
+			if weighted:
+				csr_weights[slots] = weights[order]
+			cursor += np.diff(grouped.indptr)
+
+		return csrGraph(offsets, csr_targets, node_num, csr_weights)
+
+
 class plotGraph:
 	"""Plots the web-graph, graphically on the screen.
 
+	Only the top `k` nodes and (at most `max_children` of) their children
+	are drawn. Positions of nodes are kept between plots, so successive
+	frames only lay out the nodes which are new.
+
 	...
 
 	Parameters
 	----------
-	edges : collections.defaltdict(list)
+	edges : collections.defaltdict(list) or csrGraph
 		Adjacency list containing information of connections in web-graph.
 	
 	interval : int, optional
 		Time in milli-seconds for which graph is shown on screen
 		Default value: 5000
+
+	max_children : int, optional
+		Highest number of children drawn for each of the top `k` nodes. The
+		highest ranked children are drawn.
+		Default value: 20
+
+	output_dir : string, optional
+		If given, frames are rendered off-screen and saved as images in this
+		directory instead of being shown on screen.
+		Default value: None
+
+	name : string, optional
+		Prefix of the image files.
+		Default value: 'frame'
 	
 	
 	Methods
@@ -73,22 +855,31 @@ class plotGraph:
 	get_KMaxRankNodes(number_of_nodes, rank_vector)
 		Calculates and Returns `number_of_nodes` with highest value in `rank_vector`.
 
-	get_edgesConnectedToTopK(rank_vector, topK, ranks)
-		Calculates and Return the list of child nodes of the top `k` nodes.
+	get_edgesConnectedToTopK(rank_vector, topK)
+		Calculates and Return the edges from the top `k` nodes to their children.
 
-	get_EdgesToDrawWithRanks(drawing_list, ranks)
-		Returns list of edges and rank of nodes to be shown on graph.
+	get_layout(edge_list)
+		Returns positions of the nodes, reusing the positions of earlier plots.
 
-	draw(edge_list, nodes_to_draw)
-		Draws the directed-graph on the screen with size of node equivalent to rank of nodes.
+	draw(edge_list, nodes_to_draw, node_sizes)
+		Draws the directed-graph with size of node equivalent to rank of nodes.
 
 	plot(number_of_nodes, rank_vector)
 		Utility function which calls other functions in appropriate order to plot the graph.
 
 	"""
-	def __init__(self, edges, interval=5000):
+	def __init__(self, edges, interval=5000, max_children=20, output_dir=None,
+		name='frame'):
 		self.edges = edges
 		self.interval = interval
+		self.max_children = max_children
+		self.output_dir = output_dir
+		self.name = name
+		self.positions = {}
+		self.frame = 0
+
+		if output_dir is not None:
+			os.makedirs(output_dir, exist_ok=True)
 
 
 	def get_KMaxRankNodes(self, number_of_nodes, rank_vector):
@@ -106,21 +897,21 @@ class plotGraph:
 		
 		Returns
 		-------
-		topK : list of tuple [(int, double), (int, double), ...]
-			Contain node and rank of top `number_of_nodes`. 
+		topK : list of tuple [(double, int), (double, int), ...]
+			Contain rank and node of top `number_of_nodes`, highest first.
 
 		"""
-		heaped_ranks = [(rank, node) for (node, rank) in 
-			enumerate(rank_vector)]
-		heapq._heapify_max(heaped_ranks)
-		topK = [heapq._heappop_max(heaped_ranks)
-			for _ in range(number_of_nodes)]
+		topK = streamingTopK(number_of_nodes).feed(rank_vector).get_topK()
 
 		return topK
 
 
-	def get_edgesConnectedToTopK(self, rank_vector, topK, ranks):
-		"""Calculates and Return the list of child nodes of the top `k` nodes.
+	def get_edgesConnectedToTopK(self, rank_vector, topK):
+		"""Calculates and Return the edges from the top `k` nodes to their children.
+
+		Children are read as a slice of the adjacency list (CSR row). Nodes
+		with more than `max_children` children only keep the highest ranked
+		ones.
 
 
 		Parameters
@@ -128,82 +919,61 @@ class plotGraph:
 		rank_vector	: numpy.ndarray [1-dimensional, dtype=float]
 			Contains PageRank of each node in the web-graph.
 
-		topK : list of tuple [(int, double), (int, double), ...]
-			Contain node and rank of top `number_of_nodes`. 
-
-		ranks : dict {int: double, int: double}
-			Contains rank of the nodes int the web-graph.
+		topK : list of tuple [(double, int), (double, int), ...]
+			Contain rank and node of top `number_of_nodes`. 
 
 		
 		Returns
 		-------
-		weighted_edges : defaultdict(list) 
-			{
-				(int, double): [(int, double), (int, double), ...],
-				(int, double): [(int, double), (int, double), ...],
-				(int, double): [(int, double), (int, double), ...],
-				... 
-			}
-			(int, double) : (node: rank) 
-			Here node belongs to the list of nodes with top k ranks.
-			Contains top `k` nodes with their childs in list.
+		edge_list : list of tuple [(int, int), (int, int), ...]
+			(int, int) : (node1, node2)
+			Symbolizes directed edges from node1 to node2.
 
 		"""
-		weighed_edges = defaultdict(list)
-		
-		for couple in topK:
-			weighed_edges[(couple[1], couple[0])] = [(node, ranks[node]) 
-				for node in self.edges[couple[1]]]
+		edge_list = []
+		for (_, node) in topK:
+			children = np.asarray(self.edges[node], dtype=np.int64)
+			if len(children) > self.max_children:
+				children = children[np.argpartition(-rank_vector[children],
+					self.max_children - 1)[:self.max_children]]
+			edge_list.extend((node, int(child)) for child in children)
 
-		return weighed_edges
+		return edge_list
 
 
-	def get_EdgesToDrawWithRanks(self, drawing_list, ranks):
-		"""Returns list of edges and rank of nodes to be shown on graph.
+	def get_layout(self, graph):
+		"""Returns positions of the nodes, reusing the positions of earlier plots.
+
 
-		
 		Parameters
 		----------
-		drawing_list : defaultdict(list)
-		{
-			(int, double): [(int, double), (int, double), ...],
-			(int, double): [(int, double), (int, double), ...],
-			(int, double): [(int, double), (int, double), ...],
-			... 
-		}
-		(int, double) : (node: rank) 
-		Here node belongs to the list of nodes with top k ranks.
-		Contains top `k` nodes with their childs in list.
-
-		ranks : dict {int: double, int: double}
-			Contains rank of the nodes int the web-graph.
+		graph : networkx.DiGraph
+			Graph to be drawn.
 
 		
 		Returns
 		-------
-		edge_list : list of tuple [(int, int), (int, int), ...]
-			(int, int) : (node1, node2)
-			Symbolizes directed edges from node1 to node2.
-
-		nodes_to_draw : list of tuple [(int, double), (int, double), ...]
-			(int, double) : (node, rank)
-			Node belongs to a set of nodes to be drawn on the graph.
+		pos : dict {int: numpy.ndarray, ...}
+			Position of each node of `graph`.
 
 		"""
-		edge_list=[]
-		to_draw_node_set = set();
-		for (node, rank) in drawing_list:
-			to_draw_node_set.add(node)
-			for child in drawing_list[(node, rank)]:
-				to_draw_node_set.add(child[0])
-				edge_list.append((node, child[0]))
+		known = [node for node in graph if node in self.positions]
+		if len(known) < len(graph):
+			if known:
+				pos = nx.spring_layout(graph, pos={node: self.positions[node]
+					for node in known}, fixed=known, seed=0)
+			else:
+				pos = nx.spring_layout(graph, seed=0)
+			self.positions.update(pos)
 
-		nodes_to_draw = [(node, ranks[node]) for node in to_draw_node_set]
-		return (edge_list, nodes_to_draw)
+		return {node: self.positions[node] for node in graph}
 
 	
-	def draw(self, edge_list, nodes_to_draw):
-		"""Draws the directed-graph on the screen with size of node equivalent to rank of nodes.
+	def draw(self, edge_list, nodes_to_draw, node_sizes):
+		"""Draws the directed-graph with size of node equivalent to rank of nodes.
+
+		The graph is shown on the screen for `interval` milli-seconds or,
+		if `output_dir` is set, saved there as the next frame.
 
 
 		Parameters
@@ -212,9 +982,11 @@ class plotGraph:
 			(int, int) : (node1, node2)
 			Symbolizes directed edges from node1 to node2.
 
-		nodes_to_draw : list of tuple [(int, double), (int, double), ...]
-			(int, double) : (node, rank)
-			Node belongs to a set of nodes to be drawn on the graph.
+		nodes_to_draw : list of int
+			Nodes to be drawn on the graph.
+
+		node_sizes : numpy.ndarray [1-dimensional, dtype=float]
+			Size of each node in `nodes_to_draw`.
 
 		
 		Returns
@@ -223,23 +995,37 @@ class plotGraph:
 
 		"""
 		Graph = nx.DiGraph()
-		Graph.add_edges_from(sorted(edge_list))
-		print(sorted(edge_list))
+		Graph.add_nodes_from(nodes_to_draw)
+		Graph.add_edges_from(edge_list)
+		pos = self.get_layout(Graph)
 		
-		fig = plt.figure()
-		timer = fig.canvas.new_timer(self.interval)
-		timer.add_callback(plt.close)
+		if self.output_dir is None:
+			fig = plt.figure()
+			timer = fig.canvas.new_timer(self.interval)
+			timer.add_callback(plt.close)
+		else:
+			fig = Figure()
+		ax = fig.add_subplot()
+		ax.set_axis_off()
 
-		# pos = nx.spring_layout(Graph)
-		pos = nx.shell_layout(Graph)
 		nx.draw_networkx_nodes(Graph, 
 				pos, 
-				cmap=plt.get_cmap('jet'), 
-				node_size=[node[1]*10000 for node in nodes_to_draw])
-		nx.draw_networkx_labels(Graph, pos, labels={node[0]: node[0] for node in nodes_to_draw})
-		nx.draw_networkx_edges(Graph, pos, arrows=True)
-		timer.start()
-		plt.show()
+				nodelist=nodes_to_draw,
+				node_size=node_sizes,
+				ax=ax)
+		permutation = getattr(self.edges, 'permutation', None)
+		nx.draw_networkx_labels(Graph, pos, labels={node: node if 
+			permutation is None else int(permutation[node]) for node in 
+			nodes_to_draw}, ax=ax)
+		nx.draw_networkx_edges(Graph, pos, arrows=True, ax=ax)
+
+		self.frame += 1
+		if self.output_dir is None:
+			timer.start()
+			plt.show()
+		else:
+			fig.savefig(os.path.join(self.output_dir, self.name + '_' + 
+				format(self.frame, '04d') + '.png'))
 
 	
 	def plot(self, number_of_nodes, rank_vector):
@@ -258,9 +1044,8 @@ class plotGraph:
 		None	
 	
 		"""
-		ranks = {node: rank for (node, rank) in enumerate(rank_vector)}
 		topK = self.get_KMaxRankNodes(number_of_nodes, rank_vector)
-		drawing_list = self.get_edgesConnectedToTopK(rank_vector, topK, ranks)
-		(edge_list, nodes_to_draw) = self.get_EdgesToDrawWithRanks(
-														drawing_list, ranks)
-		self.draw(edge_list, nodes_to_draw)
\ No newline at end of file
+		edge_list = self.get_edgesConnectedToTopK(rank_vector, topK)
+		nodes_to_draw = list(dict.fromkeys([node for (_, node) in topK] +
+			[child for (_, child) in edge_list]))
+		self.draw(edge_list, nodes_to_draw, rank_vector[nodes_to_draw] * 10000)
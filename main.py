@@ -1,57 +1,398 @@
-from graphs import getGraph
+import os
+import sys
+import time
+import warnings
+import argparse
+import contextlib
+import numpy as np
+from HITS import HITS
 from PageRank import PageRank
 from TrustRank import TrustRank
+from topk import streamingTopK
+from checkpoint import rankCheckpoint
+from graphs import getGraph, csrGraph, readPages
+from convergence import NORMS
+from TopicSpecificRank import TopicSpecificRank
+
+
+ALGORITHMS = ('pagerank', 'trustrank', 'topicspecific', 'hits')
+BACKENDS = ('list', 'matrix')
+FORMATS = ('npy', 'columns', 'tsv')
+
+
+def load_graph(graph_file, node_num=None, processes=None, weighted=False):
+	"""Loads the web-graph from an edge file or a cached `.npz` graph.
 
 
-def run(edge_file, node_num, beta=0.85, epsilon=1e-6, max_iterations=20):
-	"""Calls various ranking functions and print the rank_vectors.
-	
-	
 	Parameters
 	----------
-	edge_file : string
-		Path to the file where edges of web-graph are stored.
+	graph_file : string
+		Path to the edge file (plain, gzip or zstd) or to a graph saved by
+		`csrGraph.save()`.
+
+	node_num : int, optional
+		Number of nodes in the web-graph.
+		Default value : largest node number in the graph + 1
+
+	processes : int, optional
+		Number of processes parsing the edge file.
+		Default value : os.cpu_count()
+
+	weighted : bool, optional
+		Read edge weights from the third column of the edge file.
+		Default value : False
+
+
+	Returns
+	-------
+	graph : graphs.csrGraph
+		The web-graph.
+
+	"""
+	if graph_file.endswith('.npz'):
+		return csrGraph.load(graph_file)
+	return getGraph(graph_file).get_csrGraph(node_num, processes,
+		weighted=weighted)
+
+
+def rank(graph, node_num, algorithm='trustrank', beta=0.85, epsilon=1e-6,
+	max_iterations=20, backend='list', seed_files=(), spam_seed_files=(),
+	checkpoint=None, plot=False, processes=1, norm='l1', top_k=10,
+	results=None):
+	"""Calls the ranking functions of `algorithm` in appropriate order.
+
+
+	Parameters
+	----------
+	graph : graphs.csrGraph or collections.defaltdict(list)
+		The web-graph.
 
 	node_num : int
 		Number of nodes in the web-graph.
-	
+
+	algorithm : {'pagerank', 'trustrank', 'topicspecific', 'hits'}, optional
+		Ranking algorithm to run.
+		Default value : 'trustrank'
+
+	beta, epsilon, max_iterations : optional
+		See `PageRank`.
+		Default values : 0.85, 1e-6, 20
+
+	backend : {'list', 'matrix'}, optional
+		Power iteration on rank vectors or on the Google matrix.
+		'matrix' is only available for 'topicspecific'.
+		Default value : 'list'
+
+	seed_files : list of string, optional
+		Files with trusted pages ('trustrank') or with pages of a topic
+		('topicspecific'), one set of pages per file.
+		Default value : () (trusted pages are picked from PageRank)
+
+	spam_seed_files : list of string, optional
+		Files with known spam pages ('trustrank').
+		Default value : ()
+
+	checkpoint : checkpoint.rankCheckpoint, optional
+		Passed on to `PageRank` and `TopicSpecificRank`.
+		Default value : None
+
+	plot : bool or string, optional
+		Plot the web-graph after every iteration, on the screen or (if a
+		directory is given) into image files.
+		Default value : False
+
+	processes : int, optional
+		Number of topics solved in parallel ('topicspecific', 'list').
+		Default value : 1
+
+	norm, top_k : optional
+		How the error between two iterations is measured, see `PageRank`.
+		Default values : 'l1', 10
+
+	results : list, optional
+		If given, the convergence.rankResult of every power iteration is
+		appended to it.
+		Default value : None
+
+
+	Returns
+	-------
+	rank_vectors : dict of string and numpy.ndarray
+		[1-dimensional, dtype=float]
+		Name and values of every computed score. Main result of
+		`algorithm` comes first.
+
+	"""
+	if backend == 'matrix' and algorithm != 'topicspecific':
+		raise ValueError("'matrix' backend is only available for "
+			"'topicspecific'")
+	if results is None:
+		results = []
+
+	if algorithm == 'hits':
+		hits = HITS(graph, epsilon, max_iterations, node_num, norm, top_k)
+		hub_vector, authority_vector = hits.hits()
+		results.extend(hits.results)
+		return {'Authority': authority_vector, 'Hub': hub_vector}
+
+	if algorithm == 'topicspecific':
+		if not seed_files:
+			raise ValueError("'topicspecific' needs at least one seed file")
+		tsr = TopicSpecificRank(beta, graph, epsilon, max_iterations,
+			node_num, None, checkpoint, norm, top_k)
+		topics = [readPages(seed_file) for seed_file in seed_files]
+		if backend == 'list' and processes > 1 and len(topics) > 1:
+			rank_vectors = tsr.parallel_list_get_topicSpecificRank(topics,
+				min(processes, len(topics)))
+			results.extend(tsr.results)
+			return {'TopicSpecificRank-' + str(topic_number): rank_vector
+				for (topic_number, rank_vector) in rank_vectors.items()}
+
+		rank_vectors = {}
+		for (topic_number, topic) in enumerate(topics):
+			if backend == 'list':
+				rank_vector = tsr.list_get_topicSpecificRank(topic,
+					topic_number)
+			else:
+				rank_vector = tsr.matrix_get_topicSpecificRank(topic,
+					tsr.matrix_get_initailRankMatrix(),
+					tsr.matrix_get_topicSpecificGoogleMatrix(topic))
+				rank_vector = rank_vector.toarray().ravel()
+			rank_vectors['TopicSpecificRank-' + str(topic_number)] = (
+				rank_vector)
+		results.extend(tsr.results)
+		return rank_vectors
+
+	pr = PageRank(beta, graph, epsilon, max_iterations, node_num, checkpoint,
+		plot, norm, top_k)
+	PageRank_vector = pr.pageRank()
+	results.extend(pr.results)
+	if algorithm == 'pagerank':
+		return {'PageRank': PageRank_vector}
+
+	tr = TrustRank(beta, graph, epsilon, max_iterations, node_num,
+		PageRank_vector, plot, norm, top_k)
+	if not seed_files:
+		TrustRank_vector = tr.trustRank()
+		results.extend(tr.results)
+		return {'TrustRank': TrustRank_vector, 'PageRank': PageRank_vector}
+
+	trust_vectors, antitrust_vectors = tr.batch_trustRank(seed_files,
+		spam_seed_files)
+	results.extend(tr.results)
+	spam_mass = tr.get_spamMass(trust_vectors, [len(readPages(seed_file)) for
+		seed_file in seed_files])
+	rank_vectors = {}
+	for column in range(trust_vectors.shape[1]):
+		rank_vectors['TrustRank-' + str(column)] = trust_vectors[:, column]
+		rank_vectors['SpamMass-' + str(column)] = spam_mass[:, column]
+	for column in range(antitrust_vectors.shape[1]):
+		rank_vectors['AntiTrustRank-' + str(column)] = antitrust_vectors[:,
+			column]
+	rank_vectors['PageRank'] = PageRank_vector
+	return rank_vectors
+
+
+def write_ranks(rank_vectors, output=None, output_format='tsv', top_k=10):
+	"""Writes the rank vectors in bulk.
+
+
+	Parameters
+	----------
+	rank_vectors : dict of string and numpy.ndarray
+		Output of `rank()`.
+
+	output : string, optional
+		Path of the output file.
+		Default value : None (standard output, 'tsv' only)
+
+	output_format : {'npy', 'columns', 'tsv'}, optional
+		'npy' : one (n x k) array, columns in the order of `rank_vectors`.
+		'columns' : `.npz` with a 'node' column and one column per score.
+		'tsv' : `top_k` nodes with the highest main score, one per line.
+		Default value : 'tsv'
+
+	top_k : int, optional
+		Number of nodes written in 'tsv' format.
+		Default value : 10
+
+
+	Returns
+	-------
+	None
+
+	"""
+	names = list(rank_vectors)
+	if output_format == 'npy':
+		np.save(output, np.column_stack([rank_vectors[name] for name in names]))
+	elif output_format == 'columns':
+		node_num = len(rank_vectors[names[0]])
+		np.savez(output, node=np.arange(node_num), **rank_vectors)
+	else:
+		topK = streamingTopK(top_k).feed(rank_vectors[names[0]])
+		top_nodes = [node for (_, node) in topK.get_topK()]
+
+		lines = ['node\t' + '\t'.join(names)]
+		lines.extend(str(node) + '\t' + '\t'.join(repr(float(
+			rank_vectors[name][node])) for name in names)
+			for node in top_nodes)
+		if output is None:
+			sys.stdout.write('\n'.join(lines) + '\n')
+		else:
+			with open(output, 'w') as o_file:
+				o_file.write('\n'.join(lines) + '\n')
+
+
+def run(edge_file, node_num=None, beta=0.85, epsilon=1e-6, max_iterations=20,
+	algorithm='trustrank', processes=None, **kwargs):
+	"""Loads the web-graph and calls the ranking functions.
+
+
+	Parameters
+	----------
+	edge_file : string
+		Path to the file where edges of web-graph are stored, or to a graph
+		saved by `csrGraph.save()`.
+
+	node_num : int, optional
+		Number of nodes in the web-graph.
+		Default value : largest node number in the graph + 1
+
 	beta : float, optional
-		Probability with which teleports will occur.
+		Probability with which a random surfer follows a link (damping
+		factor). Teleports occur with probability 1 - beta.
 		Default value : 0.85
-	
+
 	epsilon : float, optional
 		A small value and total error in ranks should be less than epsilon.
 		Default value : 1e-6
-	
+
 	max_iterations : int, optional
 		Maximum number of times to apply power iteration.
 		Default value : 20
 
-	
+	algorithm : {'pagerank', 'trustrank', 'topicspecific', 'hits'}, optional
+		Ranking algorithm to run.
+		Default value : 'trustrank'
+
+	processes : int, optional
+		Number of processes parsing the edge file.
+		Default value : os.cpu_count()
+
+	**kwargs :
+		Passed on to `rank()`.
+
+
 	Returns
 	-------
-	None
+	rank_vectors : dict of string and numpy.ndarray
+		See `rank()`.
 
 	"""
-	gg = getGraph(edge_file)
-	edges = gg.get_connections()
-
+	graph = load_graph(edge_file, node_num, processes)
 	print("got edges...")
+	return rank(graph, node_num or graph.node_num, algorithm, beta, epsilon,
+		max_iterations, **kwargs)
 
-	pr = PageRank(beta, edges, epsilon, max_iterations, node_num)
-	PageRank_vector = pr.pageRank()
-	print(PageRank_vector, sum(PageRank_vector))
 
-	tr = TrustRank(beta, edges, epsilon, max_iterations, node_num, 
-		PageRank_vector)
-	TrustRank_vector = tr.trustRank()
-	print(TrustRank_vector, sum(TrustRank_vector))
+def get_parser():
+	"""Returns the command-line argument parser."""
+	parser = argparse.ArgumentParser(description="Rank pages of a web-graph.")
+	parser.add_argument('graph', help="edge file (plain, gzip or zstd) or a "
+		"cached `.npz` graph")
+	parser.add_argument('-a', '--algorithm', choices=ALGORITHMS,
+		default='trustrank')
+	parser.add_argument('-b', '--backend', choices=BACKENDS, default='list')
+	parser.add_argument('-n', '--node-num', type=int, default=None,
+		help="number of nodes (default: largest node number + 1)")
+	parser.add_argument('--beta', type=float, default=0.85,
+		help="probability of following a link (teleport: 1 - beta)")
+	parser.add_argument('--epsilon', type=float, default=1e-6)
+	parser.add_argument('--max-iterations', type=int, default=20)
+	parser.add_argument('--norm', choices=NORMS, default='l1',
+		help="error between iterations; topk stops once the order of the "
+		"top-k nodes is stable")
+	parser.add_argument('-p', '--processes', type=int, default=None,
+		help="processes parsing the edge file (default: all cores)")
+	parser.add_argument('--weighted', action='store_true',
+		help="read edge weights from the third column")
+	parser.add_argument('--reorder', choices=('degree', 'bfs'), default=None,
+		help="relabel nodes for memory locality (results keep original "
+		"node numbers)")
+	parser.add_argument('--seeds', nargs='+', default=(),
+		help="trusted page files (trustrank) or topic files (topicspecific)")
+	parser.add_argument('--spam-seeds', nargs='+', default=(),
+		help="known spam page files (trustrank)")
+	parser.add_argument('--save-graph', metavar='NPZ',
+		help="cache the loaded graph for faster loading")
+	parser.add_argument('--checkpoint', metavar='DIR')
+	parser.add_argument('--checkpoint-iterations', type=int, default=None)
+	parser.add_argument('--checkpoint-seconds', type=float, default=None)
+	parser.add_argument('--resume', action='store_true')
+	parser.add_argument('-o', '--output', default=None,
+		help="output file (default: top-k TSV on standard output)")
+	parser.add_argument('-f', '--format', choices=FORMATS, default='tsv')
+	parser.add_argument('-k', '--top-k', type=int, default=10,
+		help="nodes written in tsv format and compared by --norm topk")
+	parser.add_argument('--plot', nargs='?', const=True, default=False,
+		metavar='DIR', help="plot the web-graph after every iteration, "
+		"into image files in DIR if given")
+	parser.add_argument('-q', '--quiet', action='store_true',
+		help="print only timing stats")
+	return parser
 
 
-if __name__ == '__main__':
-	location_of_the_edge_file = "./data/test"
-	number_of_nodes_in_web_graph = 9
+def main(argv=None):
+	"""Command-line entry point."""
+	parser = get_parser()
+	args = parser.parse_args(argv)
+	if args.output is None and args.format != 'tsv':
+		parser.error("--format " + args.format + " needs --output")
+	if args.backend == 'matrix' and args.algorithm != 'topicspecific':
+		parser.error("--backend matrix is only available for topicspecific")
+	if args.algorithm == 'topicspecific' and not args.seeds:
+		parser.error("topicspecific needs --seeds")
+
+	checkpoint = None
+	if args.checkpoint is not None:
+		checkpoint = rankCheckpoint(args.checkpoint,
+			args.checkpoint_iterations, args.checkpoint_seconds, args.resume)
+
+	timings = []
+	results = []
+	with open(os.devnull, 'w') as devnull:
+		log = devnull if args.quiet else sys.stderr
+		with contextlib.redirect_stdout(log), warnings.catch_warnings():
+			if args.quiet:
+				warnings.simplefilter('ignore', RuntimeWarning)
+			start = time.perf_counter()
+			graph = load_graph(args.graph, args.node_num, args.processes,
+				args.weighted)
+			if args.reorder is not None:
+				graph = graph.reorder(args.reorder)
+			if args.save_graph:
+				graph.save(args.save_graph)
+			timings.append(('load', time.perf_counter() - start))
 
-	# location_of_the_edge_file = "./data/WikiTalk.data"
-	# number_of_nodes_in_web_graph = 2394385
-	run(location_of_the_edge_file, number_of_nodes_in_web_graph)
\ No newline at end of file
+			start = time.perf_counter()
+			rank_vectors = rank(graph, args.node_num or graph.node_num,
+				args.algorithm, args.beta, args.epsilon, args.max_iterations,
+				args.backend, args.seeds, args.spam_seeds, checkpoint,
+				args.plot, args.processes or os.cpu_count() or 1, args.norm,
+				args.top_k, results)
+			timings.append(('rank', time.perf_counter() - start))
+
+	start = time.perf_counter()
+	if args.output is not None or not args.quiet:
+		write_ranks(rank_vectors, args.output, args.format, args.top_k)
+	timings.append(('write', time.perf_counter() - start))
+
+	if not args.quiet:
+		for result in results:
+			print(result, file=sys.stderr)
+	for (step, seconds) in timings:
+		print(step + '\t' + format(seconds, '.3f') + 's', file=sys.stderr)
+
+
+if __name__ == '__main__':
+	main()
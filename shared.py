@@ -0,0 +1,241 @@
+import os
+import numpy as np
+from graphs import csrGraph
+from multiprocessing import shared_memory, resource_tracker
+
+
+def _get_tracker():
+	"""Returns the identity of the resource tracker of this process."""
+	# the tracker is reached through a pipe which child processes inherit,
+	# so processes sharing a tracker share the pipe
+	resource_tracker.ensure_running()
+	status = os.fstat(resource_tracker._resource_tracker._fd)
+	return (status.st_dev, status.st_ino)
+
+
+def _attach_block(name, tracker):
+	"""Attaches to an existing shared memory block without owning it."""
+	try:
+		return shared_memory.SharedMemory(name=name, track=False)
+	except TypeError:
+		# before Python 3.13 attaching registers the block with the resource
+		# tracker, which would unlink it when the tracker exits. The block
+		# is already registered with the creator's `tracker` (and the
+		# creator unregisters it), so it is unregistered from any other.
+		block = shared_memory.SharedMemory(name=name)
+		if _get_tracker() != tracker:
+			resource_tracker.unregister(block._name, 'shared_memory')
+		return block
+
+
+class sharedGraph:
+	"""Web-graph and rank vectors kept in shared memory.
+
+	The creating process copies the arrays of a csrGraph (and any rank
+	vectors) into `multiprocessing.shared_memory` blocks once. Other
+	processes attach to them by name through a small, picklable `handle`
+	and use them as NumPy arrays without copying. Only the creator unlinks
+	the blocks; everyone calls `release()` when done.
+
+	...
+
+	Parameters
+	----------
+	handle : dict
+		{'node_num': int, 'arrays': {name: (block name, shape, dtype)},
+		'tracker': resource tracker of the creator} as returned by
+		`create(...).handle`.
+
+	owner : bool, optional
+		True only for the process which created the blocks.
+		Default value : False
+
+	blocks : dict of string and shared_memory.SharedMemory, optional
+		Already open blocks, by array name (used by `create()`).
+		Default value : None
+
+
+	Methods
+	-------
+	create(graph, **rank_vectors)
+		Copies `graph` and `rank_vectors` into new shared memory blocks.
+
+	attach(handle)
+		Attaches to the blocks described by `handle`.
+
+	get_graph()
+		Returns the shared web-graph as a csrGraph.
+
+	get_array(name)
+		Returns a shared array by its name.
+
+	release()
+		Detaches from the blocks and, in the creator, frees them.
+
+	"""
+	def __init__(self, handle, owner=False, blocks=None):
+		self.handle = handle
+		self.owner = owner
+		self.blocks = blocks or {}
+		self.arrays = {}
+
+		for (name, (block_name, shape, dtype)) in handle['arrays'].items():
+			if name not in self.blocks:
+				self.blocks[name] = _attach_block(block_name,
+					handle['tracker'])
+			block = self.blocks[name]
+			self.arrays[name] = np.ndarray(shape, dtype=dtype,
+				buffer=block.buf)
+
+
+	@classmethod
+	def create(cls, graph, **rank_vectors):
+		"""Copies `graph` and `rank_vectors` into new shared memory blocks.
+
+
+		Parameters
+		----------
+		graph : csrGraph
+			The web-graph.
+
+		**rank_vectors : numpy.ndarray
+			Any further arrays (e.g. rank vectors or result matrices) to be
+			shared, by name.
+
+
+		Returns
+		-------
+		shared : sharedGraph
+			Owner of the new blocks.
+
+		"""
+		arrays = {'offsets': graph.offsets, 'targets': graph.targets}
+		if graph.weights is not None:
+			arrays['weights'] = graph.weights
+		if graph.permutation is not None:
+			arrays['permutation'] = graph.permutation
+		arrays.update(rank_vectors)
+
+		handle = {'node_num': int(graph.node_num), 'arrays': {},
+			'tracker': _get_tracker()}
+		blocks = {}
+		try:
+			for (name, array) in arrays.items():
+				array = np.asarray(array)
+				block = shared_memory.SharedMemory(create=True,
+					size=max(array.nbytes, 1))
+				blocks[name] = block
+				np.ndarray(array.shape, dtype=array.dtype,
+					buffer=block.buf)[...] = array
+				handle['arrays'][name] = (block.name, array.shape,
+					array.dtype.str)
+		except BaseException:
+			for block in blocks.values():
+				block.close()
+				block.unlink()
+			raise
+
+		return cls(handle, owner=True, blocks=blocks)
+
+
+	@classmethod
+	def attach(cls, handle):
+		"""Attaches to the blocks described by `handle`.
+
+
+		Parameters
+		----------
+		handle : dict
+			`handle` of the sharedGraph created by another process.
+
+
+		Returns
+		-------
+		shared : sharedGraph
+			Zero-copy view of the shared arrays.
+
+		"""
+		return cls(handle)
+
+
+	def get_graph(self):
+		"""Returns the shared web-graph as a csrGraph.
+
+		The returned graph uses the shared arrays directly. Its cached
+		transpose (if built) is private to the calling process.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		graph : csrGraph
+			The shared web-graph.
+
+		"""
+		graph = csrGraph(self.arrays['offsets'], self.arrays['targets'],
+			self.handle['node_num'], permutation=self.arrays.get('permutation'))
+		# weights were normalized before being shared
+		graph.weights = self.arrays.get('weights')
+		return graph
+
+
+	def get_array(self, name):
+		"""Returns a shared array by its name.
+
+
+		Parameters
+		----------
+		name : string
+			Name given to `create()`.
+
+
+		Returns
+		-------
+		array : numpy.ndarray
+			The shared (writable) array.
+
+		"""
+		return self.arrays[name]
+
+
+	def release(self):
+		"""Detaches from the blocks and, in the creator, frees them.
+
+		Arrays obtained from this sharedGraph must not be used afterwards.
+		Memory of a block stays mapped until the last such array is gone.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		None
+
+		"""
+		self.arrays = {}
+		for block in self.blocks.values():
+			try:
+				block.close()
+			except BufferError:
+				pass
+			if self.owner:
+				try:
+					block.unlink()
+				except FileNotFoundError:
+					# already unlinked (e.g. by a resource tracker)
+					resource_tracker.unregister(block._name, 'shared_memory')
+		self.blocks = {}
+
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.release()
@@ -0,0 +1,358 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+import numpy as np
+from PageRank import PageRank
+from topk import streamingTopK
+from shared import sharedGraph
+from convergence import NORMS
+from main import load_graph
+from graphs import readPages
+from TopicSpecificRank import TopicSpecificRank
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _solve_chain(graph, node_num, chain, parameters, ranks):
+	"""Solves the configurations of `chain` (all with the same teleport set)
+	in order, each starting from the nearest configuration solved before.
+
+	Returns a list of (configuration index, index of the configuration it
+	started from or None, seconds, convergence.rankResult).
+	"""
+	max_iterations, norm, top_k = parameters
+	solved = {}
+	reports = []
+	for (index, beta, epsilon, teleport_set) in chain:
+		nearest = min(solved, key=lambda done: (abs(done[0] - beta), done[1]),
+			default=None)
+		warm_start = None if nearest is None else solved[nearest]
+		initial_rank_vector = None if warm_start is None else ranks[:,
+			warm_start]
+
+		start = time.perf_counter()
+		with open(os.devnull, 'w') as devnull:
+			with contextlib.redirect_stdout(devnull):
+				if teleport_set is None:
+					solver = PageRank(beta, graph, epsilon, max_iterations,
+						node_num, plot=False, norm=norm, top_k=top_k)
+					ranks[:, index] = solver.pageRank(initial_rank_vector)
+				else:
+					solver = TopicSpecificRank(beta, graph, epsilon,
+						max_iterations, node_num, None, norm=norm, top_k=top_k)
+					ranks[:, index] = solver.list_get_topicSpecificRank(
+						teleport_set, index, initial_rank_vector)
+		seconds = time.perf_counter() - start
+
+		result = solver.results[-1]
+		result.rank_vector = None
+		solved[(beta, epsilon)] = index
+		reports.append((index, warm_start, seconds, result))
+	return reports
+
+
+def _solve_shared_chain(task):
+	"""Solves one chain in a worker process attached to the shared graph."""
+	handle, chain, parameters = task
+	shared = sharedGraph.attach(handle)
+	try:
+		return _solve_chain(shared.get_graph(), handle['node_num'], chain,
+			parameters, shared.get_array('sweep_ranks'))
+	finally:
+		shared.release()
+
+
+class parameterSweep:
+	"""Ranks one loaded web-graph for a grid of parameters.
+
+	The graph (and its transition matrix) is built once and reused by every
+	configuration of `beta`, `epsilon` and teleport set. Configurations with
+	the same teleport set are solved in order of `beta` and each starts from
+	the already solved configuration with the nearest `beta`, which needs
+	far fewer iterations than starting from scratch. Different teleport
+	sets are independent and are solved in parallel processes sharing the
+	graph through `shared.sharedGraph`.
+
+	...
+
+	Parameters
+	----------
+	graph : graphs.csrGraph
+		The web-graph.
+
+	max_iterations : int, optional
+		Maximum number of times to apply power iteration per configuration.
+		Default value : 100
+
+	norm : {'l1', 'linf', 'topk'}, optional
+		How the error between two iterations is measured, see `PageRank`.
+		Default value : 'l1'
+
+	top_k : int, optional
+		Number of nodes compared by the 'topk' norm.
+		Default value : 10
+
+	processes : int, optional
+		Number of worker processes. If there are fewer teleport sets than
+		processes, the `beta` range of each teleport set is split too (every
+		part then starts from scratch once).
+		Default value : 1
+
+
+	Attributes
+	----------
+	configurations : list of tuple [(float, float, string), ...]
+		(beta, epsilon, teleport set name) of every configuration.
+
+	rank_vectors : numpy.ndarray [2-dimensional, dtype=float,
+		shape = (n x len(configurations))]
+		Column `i` contains the rank of each node for configuration `i`.
+
+	results : list of convergence.rankResult
+		Convergence report of every configuration.
+
+	warm_starts : list of int or None
+		Configuration each one started from (None if from scratch).
+
+	seconds : list of float
+		Time taken to solve every configuration.
+
+
+	Methods
+	-------
+	get_configurations(betas, epsilons, teleport_sets)
+		Returns every combination of the given parameters.
+
+	get_chains(configurations)
+		Groups configurations into chains solved one after another.
+
+	run(betas, epsilons, teleport_sets=None)
+		Ranks the web-graph for every combination of the given parameters.
+
+	get_table(top_nodes=3)
+		Returns results and convergence stats as a tab separated table.
+
+	"""
+	def __init__(self, graph, max_iterations=100, norm='l1', top_k=10,
+		processes=1):
+		self.graph = graph
+		self.node_num = graph.node_num
+		self.MAX_ITERATIONS = max_iterations
+		self.norm = norm
+		self.top_k = top_k
+		self.processes = processes
+
+		self.configurations = []
+		self.rank_vectors = np.zeros((self.node_num, 0))
+		self.results = []
+		self.warm_starts = []
+		self.seconds = []
+
+
+	def get_configurations(self, betas, epsilons, teleport_sets):
+		"""Returns every combination of the given parameters.
+
+
+		Parameters
+		----------
+		betas, epsilons : list of float
+			Values of `beta` and `epsilon`.
+
+		teleport_sets : dict of string and (list of int or None)
+			Teleport sets by name; None teleports to every node (PageRank).
+
+
+		Returns
+		-------
+		configurations : list of tuple [(int, float, float, string), ...]
+			(index, beta, epsilon, teleport set name) of every combination.
+
+		"""
+		combinations = [(beta, epsilon, name) for name in teleport_sets for
+			beta in betas for epsilon in epsilons]
+		return [(index,) + combination for (index, combination) in
+			enumerate(combinations)]
+
+
+	def get_chains(self, configurations):
+		"""Groups configurations into chains solved one after another.
+
+		A chain holds configurations of one teleport set, by increasing
+		`beta` and, for equal `beta`, decreasing `epsilon`, so each one can
+		start from the one solved just before it.
+
+
+		Parameters
+		----------
+		configurations : list of tuple
+			Output of `get_configurations()`.
+
+
+		Returns
+		-------
+		chains : list of list of tuple
+			Configurations of each chain, in the order they are solved.
+
+		"""
+		chains = {}
+		for configuration in configurations:
+			chains.setdefault(configuration[3], []).append(configuration)
+		chains = [sorted(chain, key=lambda configuration: (configuration[1],
+			-configuration[2])) for chain in chains.values()]
+
+		parts = -(-self.processes // max(len(chains), 1))
+		split_chains = []
+		for chain in chains:
+			size = -(-len(chain) // parts)
+			split_chains.extend(chain[start:start + size] for start in
+				range(0, len(chain), size))
+		return split_chains
+
+
+	def run(self, betas, epsilons, teleport_sets=None):
+		"""Ranks the web-graph for every combination of the given parameters.
+
+
+		Parameters
+		----------
+		betas, epsilons : list of float
+			Values of `beta` and `epsilon`.
+
+		teleport_sets : dict of string and (list of int or None), optional
+			Teleport sets by name; None teleports to every node (PageRank).
+			Default value : {'PageRank': None}
+
+
+		Returns
+		-------
+		rank_vectors : numpy.ndarray [2-dimensional, dtype=float,
+			shape = (n x number of combinations)]
+			Column `i` contains the rank of each node for configuration `i`.
+
+		"""
+		if teleport_sets is None:
+			teleport_sets = {'PageRank': None}
+		configurations = self.get_configurations(betas, epsilons,
+			teleport_sets)
+		chains = [[(index, beta, epsilon, teleport_sets[name]) for (index,
+			beta, epsilon, name) in chain] for chain in self.get_chains(
+			configurations)]
+		parameters = (self.MAX_ITERATIONS, self.norm, self.top_k)
+
+		rank_vectors = np.zeros((self.node_num, len(configurations)))
+		if self.processes > 1 and len(chains) > 1:
+			with sharedGraph.create(self.graph, sweep_ranks=rank_vectors
+				) as shared:
+				tasks = [(shared.handle, chain, parameters) for chain in chains]
+				with ProcessPoolExecutor(min(self.processes, len(chains))
+					) as executor:
+					reports = list(executor.map(_solve_shared_chain, tasks))
+				rank_vectors = shared.get_array('sweep_ranks').copy()
+		else:
+			reports = [_solve_chain(self.graph, self.node_num, chain,
+				parameters, rank_vectors) for chain in chains]
+
+		reports = sorted(report for chain_reports in reports for report in
+			chain_reports)
+		self.configurations = [configuration[1:] for configuration in
+			configurations]
+		self.rank_vectors = rank_vectors
+		self.warm_starts = [warm_start for (_, warm_start, _, _) in reports]
+		self.seconds = [seconds for (_, _, seconds, _) in reports]
+		self.results = [result for (_, _, _, result) in reports]
+		for (index, result) in enumerate(self.results):
+			result.rank_vector = rank_vectors[:, index]
+		return rank_vectors
+
+
+	def get_table(self, top_nodes=3):
+		"""Returns results and convergence stats as a tab separated table.
+
+
+		Parameters
+		----------
+		top_nodes : int, optional
+			Number of highest ranked nodes listed per configuration.
+			Default value : 3
+
+
+		Returns
+		-------
+		table : string
+			One line per configuration: parameters, iterations, whether it
+			converged, final residual, configuration it started from, time
+			and highest ranked nodes.
+
+		"""
+		lines = ['#\tbeta\tepsilon\tteleport\titerations\tconverged\t'
+			'residual\tstart\tseconds\ttop nodes']
+		for (index, (beta, epsilon, name)) in enumerate(self.configurations):
+			result = self.results[index]
+			warm_start = self.warm_starts[index]
+			topK = streamingTopK(top_nodes).feed(self.rank_vectors[:, index])
+			lines.append('\t'.join([str(index), format(beta, 'g'),
+				format(epsilon, 'g'), name, str(result.iterations),
+				'yes' if result.converged else 'no',
+				format(result.residual, '.3g'),
+				'-' if warm_start is None else str(warm_start),
+				format(self.seconds[index], '.3f'),
+				','.join(str(node) for (_, node) in topK.get_topK())]))
+		return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+	"""Command-line entry point."""
+	parser = argparse.ArgumentParser(description="Rank a web-graph for a "
+		"grid of beta, epsilon and teleport sets.")
+	parser.add_argument('graph', help="edge file (plain, gzip or zstd) or a "
+		"cached `.npz` graph")
+	parser.add_argument('--betas', type=float, nargs='+', default=[0.85])
+	parser.add_argument('--epsilons', type=float, nargs='+', default=[1e-6])
+	parser.add_argument('--seeds', nargs='+', default=(),
+		help="teleport set files (default: PageRank only)")
+	parser.add_argument('--pagerank', action='store_true',
+		help="also rank with every node as teleport set when --seeds given")
+	parser.add_argument('-n', '--node-num', type=int, default=None)
+	parser.add_argument('--max-iterations', type=int, default=100)
+	parser.add_argument('--norm', choices=NORMS, default='l1')
+	parser.add_argument('-k', '--top-k', type=int, default=10,
+		help="nodes compared by --norm topk")
+	parser.add_argument('-p', '--processes', type=int, default=None,
+		help="processes loading the graph and solving configurations "
+		"(default: all cores)")
+	parser.add_argument('--weighted', action='store_true')
+	parser.add_argument('-o', '--output', default=None,
+		help="`.npz` file with one rank column per configuration")
+	args = parser.parse_args(argv)
+
+	teleport_sets = {}
+	if args.pagerank or not args.seeds:
+		teleport_sets['PageRank'] = None
+	for seed_file in args.seeds:
+		teleport_sets[seed_file] = readPages(seed_file)
+
+	processes = args.processes or os.cpu_count() or 1
+	start = time.perf_counter()
+	with contextlib.redirect_stdout(sys.stderr):
+		graph = load_graph(args.graph, args.node_num, processes, args.weighted)
+	print('load\t' + format(time.perf_counter() - start, '.3f') + 's',
+		file=sys.stderr)
+
+	sweep = parameterSweep(graph, args.max_iterations, args.norm, args.top_k,
+		processes)
+	start = time.perf_counter()
+	sweep.run(args.betas, args.epsilons, teleport_sets)
+	print('sweep\t' + format(time.perf_counter() - start, '.3f') + 's',
+		file=sys.stderr)
+
+	sys.stdout.write(sweep.get_table())
+	if args.output is not None:
+		np.savez(args.output, node=np.arange(sweep.node_num), **{
+			name + ':beta=' + format(beta, 'g') + ':epsilon=' + format(
+			epsilon, 'g'): sweep.rank_vectors[:, index] for (index, (beta,
+			epsilon, name)) in enumerate(sweep.configurations)})
+
+
+if __name__ == '__main__':
+	main()
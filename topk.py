@@ -0,0 +1,129 @@
+import numpy as np
+
+
+class streamingTopK:
+	"""Keeps the `k` highest ranked nodes of a rank vector fed block by block.
+
+	Only `k` candidates (and the block being fed) are held in memory, so
+	the rank vector may be produced piece by piece or read from a
+	memory-mapped file without ever being sorted as a whole. Scores are
+	exact. Ties are broken in favour of the larger node number, like
+	popping from a max-heap of (rank, node) tuples.
+
+	...
+
+	Parameters
+	----------
+	k : int
+		Number of nodes to keep.
+
+
+	Methods
+	-------
+	update(rank_block, start=0)
+		Feeds ranks of nodes `start`, `start + 1`, ... to the tracker.
+
+	feed(rank_vector, block_size=1<<20)
+		Feeds a whole (in-memory or memory-mapped) rank vector block by block.
+
+	get_topK()
+		Returns the `k` highest ranked nodes seen so far.
+
+	"""
+	def __init__(self, k):
+		self.k = k
+		self.nodes = np.empty(0, dtype=np.int64)
+		self.ranks = np.empty(0)
+
+
+	def update(self, rank_block, start=0):
+		"""Feeds ranks of nodes `start`, `start + 1`, ... to the tracker.
+
+
+		Parameters
+		----------
+		rank_block : numpy.ndarray [1-dimensional, dtype=float]
+			Ranks of consecutive nodes.
+
+		start : int, optional
+			Node number of the first rank in `rank_block`.
+			Default value : 0
+
+
+		Returns
+		-------
+		None
+
+		"""
+		rank_block = np.asarray(rank_block)
+		if self.k <= 0 or len(rank_block) == 0:
+			return
+		if len(self.ranks) == self.k and rank_block.max() < self.ranks.min():
+			return
+
+		candidates = self.select(rank_block)
+		self.nodes = np.concatenate((self.nodes, candidates + start))
+		self.ranks = np.concatenate((self.ranks, rank_block[candidates]))
+		if len(self.ranks) > self.k:
+			kept = self.select(self.ranks, self.nodes)
+			self.nodes = self.nodes[kept]
+			self.ranks = self.ranks[kept]
+
+
+	def select(self, ranks, nodes=None):
+		"""Returns indices of the (at most) `k` largest entries of `ranks`."""
+		if len(ranks) <= self.k:
+			return np.arange(len(ranks))
+		if nodes is None:
+			nodes = np.arange(len(ranks))
+
+		threshold = np.partition(ranks, len(ranks) - self.k)[len(ranks) -
+			self.k]
+		above = np.flatnonzero(ranks > threshold)
+		tied = np.flatnonzero(ranks == threshold)
+		tied = tied[np.argsort(nodes[tied], kind='stable')[::-1]]
+		return np.concatenate((above, tied[:self.k - len(above)]))
+
+
+	def feed(self, rank_vector, block_size=1<<20):
+		"""Feeds a whole (in-memory or memory-mapped) rank vector block by block.
+
+
+		Parameters
+		----------
+		rank_vector : numpy.ndarray [1-dimensional, dtype=float]
+			Contains rank of each node in the web-graph.
+
+		block_size : int, optional
+			Number of ranks read at a time.
+			Default value : 1<<20
+
+
+		Returns
+		-------
+		self : streamingTopK
+
+		"""
+		for start in range(0, len(rank_vector), block_size):
+			self.update(rank_vector[start:start + block_size], start)
+		return self
+
+
+	def get_topK(self):
+		"""Returns the `k` highest ranked nodes seen so far.
+
+
+		Parameters
+		----------
+		None
+
+
+		Returns
+		-------
+		topK : list of tuple [(double, int), (double, int), ...]
+			(rank, node) of the highest ranked nodes, highest rank first.
+
+		"""
+		order = np.lexsort((-self.nodes, -self.ranks))
+		return [(float(rank), int(node)) for (rank, node) in
+			zip(self.ranks[order], self.nodes[order])]